@@ -0,0 +1,18 @@
+import numpy as np
+
+from .image import as_image, to_uint8
+
+
+def as_array(image):
+    """Return a GrayImage, 2D list or array of pixel values as a plain uint8 array.
+
+    Other values are truncated and clamped to 0-255 with ``image.to_uint8``.
+    """
+    if isinstance(image, np.ndarray) and image.dtype == np.uint8:
+        return image.view(np.ndarray)
+    return to_uint8(image)
+
+
+def from_array(array):
+    """Wrap a uint8 result array as the GrayImage returned to callers."""
+    return as_image(array)
@@ -0,0 +1,116 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import PngImagePlugin
+
+from .arrays import as_array
+from .image_io import load_grayscale_image, open_image, to_pil_image
+
+# PNG text chunk holding the content hash of the pixels stored in the file.
+HASH_KEY = "content-hash"
+
+
+def content_hash(pixels):
+    """Return a hex digest of an image's shape and pixel values."""
+    array = np.ascontiguousarray(as_array(pixels))
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(array.shape).encode())
+    digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def stored_hash(path):
+    """Return the content hash of the image at ``path``, or None if there is none.
+
+    PNGs written by ArtifactWriter carry the hash in a text chunk read with the
+    header; other files are decoded and hashed.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open_image(path) as image:
+            if image.format == "PNG":
+                return image.info.get(HASH_KEY)
+        return content_hash(load_grayscale_image(path))
+    except OSError:
+        return None
+
+
+class ArtifactWriter:
+    """Encode and write experiment images on background threads.
+
+    ``write`` snapshots the pixels and returns immediately; at most
+    ``max_pending`` images wait to be encoded, after which ``write`` blocks so
+    memory stays bounded. Writes whose content already matches the file on
+    disk (or an earlier write to the same path) are skipped. PNGs use
+    ``compress_level`` (0-9, default 1 for speed); paths ending in ``.bmp`` or
+    ``.tif`` store uncompressed lossless files. Use as a context manager, or
+    call ``close`` to wait for pending writes and re-raise the first error.
+    """
+
+    def __init__(self, workers=2, max_pending=8, compress_level=1):
+        self.compress_level = compress_level
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._hashes = {}
+        self._pending = {}
+        self._futures = []
+        self.written = 0
+        self.skipped = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, pixels, path):
+        """Queue ``pixels`` to be saved at ``path``."""
+        # Clamp like save_grayscale_image before hashing; a plain uint8 cast would wrap
+        array = np.asarray(to_pil_image(pixels))
+        digest = content_hash(array)
+        path = os.path.abspath(path)
+        with self._lock:
+            if self._hashes.get(path) == digest:
+                self.skipped += 1
+                return
+            self._hashes[path] = digest
+            earlier = self._pending.get(path)
+        if earlier is not None:
+            # Keep writes to one path in order
+            earlier.result()
+        self._slots.acquire()
+        future = self._executor.submit(self._save, array, path, digest)
+        future.add_done_callback(lambda _: self._slots.release())
+        with self._lock:
+            self._pending[path] = future
+        self._futures.append(future)
+
+    def close(self):
+        """Wait for every queued write and shut the worker threads down."""
+        try:
+            for future in self._futures:
+                future.result()
+        finally:
+            self._futures = []
+            self._pending = {}
+            self._executor.shutdown(wait=True)
+
+    def _save(self, array, path, digest):
+        if stored_hash(path) == digest:
+            with self._lock:
+                self.skipped += 1
+            return
+        image = to_pil_image(array)
+        if path.lower().endswith(".png"):
+            info = PngImagePlugin.PngInfo()
+            info.add_text(HASH_KEY, digest)
+            image.save(path, compress_level=self.compress_level, pnginfo=info)
+        else:
+            image.save(path)
+        with self._lock:
+            self.written += 1
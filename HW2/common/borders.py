@@ -0,0 +1,80 @@
+import numpy as np
+
+BORDER_MODES = ("replicate", "reflect", "wrap", "constant")
+
+
+def border_index(index, size, border="replicate"):
+    """Map a possibly out-of-range index onto an axis of ``size`` pixels.
+
+    Returns None for positions outside the image in ``"constant"`` mode.
+    ``"reflect"`` mirrors around the edge pixel without repeating it.
+    """
+    if 0 <= index < size:
+        return index
+    if border == "replicate":
+        return 0 if index < 0 else size - 1
+    if border == "reflect":
+        if size == 1:
+            return 0
+        period = 2 * (size - 1)
+        index %= period
+        return period - index if index >= size else index
+    if border == "wrap":
+        return index % size
+    if border == "constant":
+        return None
+    raise ValueError(f"Unknown border mode: {border}")
+
+
+def border_indices(start, stop, size, border="replicate"):
+    """Vectorized ``border_index`` for the range start..stop-1; -1 marks constant fill."""
+    index = np.arange(start, stop)
+    if border == "replicate":
+        return np.clip(index, 0, size - 1)
+    if border == "reflect":
+        if size == 1:
+            return np.zeros_like(index)
+        period = 2 * (size - 1)
+        index = index % period
+        return np.where(index >= size, period - index, index)
+    if border == "wrap":
+        return index % size
+    if border == "constant":
+        return np.where((index < 0) | (index >= size), -1, index)
+    raise ValueError(f"Unknown border mode: {border}")
+
+
+def pad_image(image, offset, border="replicate", value=0):
+    """Return a 2D list padded by ``offset`` pixels on every side."""
+    height = len(image)
+    width = len(image[0])
+    columns = [border_index(x, width, border) for x in range(-offset, width + offset)]
+    padded = []
+    for y in range(-offset, height + offset):
+        source = border_index(y, height, border)
+        if source is None:
+            padded.append([value] * len(columns))
+            continue
+        row = image[source]
+        padded.append([value if x is None else row[x] for x in columns])
+    return padded
+
+
+def padded_band(array, y0, y1, offset, border="replicate", value=0):
+    """Return rows y0..y1 of a 2D array with ``offset`` pixels of border on every side.
+
+    Only the rows the band needs are read, so ``array`` may be a memory map or
+    a view into shared memory.
+    """
+    height, width = array.shape
+    rows = border_indices(y0 - offset, y1 + offset, height, border)
+    columns = border_indices(-offset, width + offset, width, border)
+    band = np.asarray(array[np.clip(rows, 0, None)])[:, np.clip(columns, 0, None)]
+    band[rows < 0] = value
+    band[:, columns < 0] = value
+    return band
+
+
+def pad_array(array, offset, border="replicate", value=0):
+    """Return a whole 2D array padded by ``offset`` pixels on every side."""
+    return padded_band(array, 0, array.shape[0], offset, border, value)
@@ -1,5 +1,206 @@
+import functools
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .arrays import as_array, from_array
+from .artifacts import content_hash
+from .borders import pad_array, pad_image
+from .cache import active_cache, cached, lookup, store
+from .image import as_image, returns_lists_for_lists, to_lists
+from .integral import box_sum, separable_box_sum
 from .utils import clamp_pixel
 
+# Upper bound on gathered window values held in memory at once.
+BAND_ELEMENTS = 1 << 22
+# Largest window (in taps) handled by the min/max selection network.
+NETWORK_MAX_TAPS = 81
+# Windows at least this wide use the running-histogram median by default.
+HISTOGRAM_MIN_WINDOW = 11
+# Relative distance under which a contra-harmonic ratio counts as an integer.
+RATIO_TOLERANCE = 1e-9
+
+# Maps a 256-bin histogram to 16 coarse bucket counts followed by 16 bucket sums.
+_BUCKET_WEIGHTS = np.hstack([
+    np.repeat(np.eye(16), 16, axis=0),
+    np.repeat(np.eye(16), 16, axis=0) * np.arange(256)[:, None],
+])
+
+
+FILTER_KINDS = ("median", "mean", "trimmed_alpha", "contra_harmonic")
+
+
+def filter_padded(padded, kind, window, *params):
+    """Run the default vectorized path of a filter on an already padded array.
+
+    ``padded`` carries ``window // 2`` extra rows and columns on every side and
+    the result covers the area inside them, so callers that split an image into
+    bands with a halo get the same pixels as filtering the whole image.
+    ``params`` are the filter's extra arguments (trim amount or Q).
+    """
+    size = 2 * (window // 2) + 1
+    if kind == "median":
+        if size >= HISTOGRAM_MIN_WINDOW:
+            return _median_histogram(padded, size)
+        return _median_sort(padded, size)
+    if kind == "mean":
+        return _mean_integral(padded, size)
+    if kind == "trimmed_alpha":
+        if size >= HISTOGRAM_MIN_WINDOW:
+            return _trimmed_alpha_histogram(padded, size, *params)
+        return _trimmed_alpha_sort(padded, size, *params)
+    if kind == "contra_harmonic":
+        return _contra_harmonic_lut(padded, size, *params)
+    raise ValueError(f"Unknown filter: {kind}")
+
+
+def filter_points(padded, kind, window, ys, xs, *params):
+    """Filter only the output pixels at (ys, xs) of an already padded array.
+
+    Returns a uint8 array with the value ``filter_padded`` would produce at
+    each point, so callers can patch a previous result where its input
+    changed. Each tap is gathered into a 1D plane and run through the same
+    selection network and sums as the full-image path, so the work is
+    proportional to the number of points.
+    """
+    ys = np.asarray(ys, dtype=np.intp)
+    xs = np.asarray(xs, dtype=np.intp)
+    size = 2 * (window // 2) + 1
+    taps = size * size
+    padded_width = padded.shape[1]
+    flat = np.ascontiguousarray(padded).reshape(-1)
+    corners = ys * padded_width + xs
+    out = np.empty(len(ys), dtype=np.uint8)
+    step = max(1, BAND_ELEMENTS // taps)
+    for start in range(0, len(ys), step):
+        band = corners[start:start + step]
+        planes = [flat.take(band + dy * padded_width + dx) for dy in range(size) for dx in range(size)]
+        if kind == "median":
+            (out[start:start + step],) = _point_ranks(planes, (taps // 2,))
+        elif kind == "mean":
+            out[start:start + step] = _plane_sum(planes) // taps
+        elif kind == "trimmed_alpha":
+            low, high = _trim_bounds(taps, *params)
+            out[start:start + step] = _plane_sum(_point_ranks(planes, range(low, high))) // (high - low)
+        elif kind == "contra_harmonic":
+            out[start:start + step] = _contra_points(planes, size, *params)
+        else:
+            raise ValueError(f"Unknown filter: {kind}")
+    return out
+
+
+def _point_ranks(planes, ranks):
+    """Select window ranks from gathered tap planes, like ``_select_ranks``."""
+    ranks = tuple(ranks)
+    if len(planes) <= NETWORK_MAX_TAPS:
+        return _network_select(planes, ranks)
+    values = np.partition(np.stack(planes, axis=-1), ranks, axis=-1)
+    return [values[:, rank] for rank in ranks]
+
+
+def _contra_points(planes, size, Q):
+    """Contra-harmonic pixels from gathered tap planes.
+
+    Float sums follow the same order as ``separable_box_sum`` (down each
+    window column, then across), so the results match the full-image path.
+    """
+    numerator_lut, denominator_lut = _power_tables(Q, size * size)
+    sums = []
+    for lut in (numerator_lut, denominator_lut):
+        looked_up = [lut[plane] for plane in planes]
+        total = None
+        for dx in range(size):
+            column = looked_up[dx].copy()
+            for dy in range(1, size):
+                column += looked_up[dy * size + dx]
+            total = column if total is None else total + column
+        sums.append(total)
+    center = planes[len(planes) // 2]
+    has_zero = np.any([plane == 0 for plane in planes], axis=0) if Q < 0 else None
+    return _contra_result(sums[0], sums[1], center, has_zero)
+
+
+def filter_bank(image, specs, border="replicate"):
+    """Run several filters over one traversal of the image.
+
+    ``specs`` is a list of ``(kind, window, *params)`` tuples such as
+    ``("median", 3)`` or ``("trimmed_alpha", 3, 1)``; the outputs come back in
+    the same order and match the individual filter functions. Specs sharing a
+    window size share one padded copy and one gather per band: the selection
+    network runs once for the union of ranks needed by median and trimmed
+    alpha (or one set of running histograms serves both on large windows),
+    and the mean reuses the gathered taps. When a cache is enabled (see
+    ``cache.enable_cache``) specs already computed for this image, by the
+    bank or by the matching filter function, are read back and skipped.
+    """
+    array = as_array(image)
+    outputs = [None] * len(specs)
+    keys = [None] * len(specs)
+    image_hash = content_hash(array) if active_cache() is not None else None
+    groups = {}
+    for index, (kind, window, *params) in enumerate(specs):
+        if kind not in FILTER_KINDS:
+            raise ValueError(f"Unknown filter: {kind}")
+        if image_hash is not None:
+            keys[index], outputs[index] = lookup(f"{kind}_filter", image_hash, [window, *params, border])
+            if outputs[index] is not None:
+                continue
+        groups.setdefault(window // 2, []).append((index, kind, tuple(params)))
+    for offset, group in groups.items():
+        padded = pad_array(array, offset, border)
+        results = _filter_bank_padded(padded, 2 * offset + 1, [spec[1:] for spec in group])
+        for (index, _, _), result in zip(group, results):
+            outputs[index] = from_array(result)
+            if keys[index] is not None:
+                store(keys[index], outputs[index])
+    return outputs
+
+
+def _filter_bank_padded(padded, size, specs):
+    """Filter one padded array with several (kind, params) specs of the same size."""
+    height = padded.shape[0] - size + 1
+    width = padded.shape[1] - size + 1
+    taps = size * size
+    outputs = [np.empty((height, width), dtype=np.uint8) for _ in specs]
+    bounds = {params: _trim_bounds(taps, *params) for kind, params in specs if kind == "trimmed_alpha"}
+    ranks = {taps // 2} if any(kind == "median" for kind, _ in specs) else set()
+    for start, end in bounds.values():
+        ranks.update(range(start, end))
+    ranks = tuple(sorted(ranks))
+
+    if size < HISTOGRAM_MIN_WINDOW:
+        needs_taps = any(kind in ("median", "mean", "trimmed_alpha") for kind, _ in specs)
+        for y0, y1 in _row_bands(height, width, taps) if needs_taps else ():
+            planes = _tap_planes(padded, size, y0, y1)
+            ranked = dict(zip(ranks, _network_select(planes, ranks)))
+            for (kind, params), output in zip(specs, outputs):
+                if kind == "median":
+                    output[y0:y1] = ranked[taps // 2]
+                elif kind == "mean":
+                    output[y0:y1] = _plane_sum(planes) // taps
+                elif kind == "trimmed_alpha":
+                    start, end = bounds[params]
+                    kept = [ranked[rank] for rank in range(start, end)]
+                    output[y0:y1] = _plane_sum(kept) // (end - start)
+    else:
+        counts = sorted({count for bound in bounds.values() for count in bound})
+        for y, histograms in _window_histograms(padded, size) if ranks else ():
+            lowest = dict(zip(counts, _histogram_lowest_sums(histograms, counts)))
+            for (kind, params), output in zip(specs, outputs):
+                if kind == "median":
+                    output[y] = _histogram_rank(histograms, taps // 2)
+                elif kind == "trimmed_alpha":
+                    start, end = bounds[params]
+                    output[y] = (lowest[end] - lowest[start]) // (end - start)
+        for (kind, params), output in zip(specs, outputs):
+            if kind == "mean":
+                output[:] = _mean_integral(padded, size)
+
+    for (kind, params), output in zip(specs, outputs):
+        if kind == "contra_harmonic":
+            output[:] = _contra_harmonic_lut(padded, size, *params)
+    return outputs
+
 
 def get_pixel_safe(image, y, x):
     """Return pixel value while handling borders by replication."""
@@ -16,97 +217,545 @@ def get_pixel_safe(image, y, x):
     return image[y][x]
 
 
-def median_filter(image, window):
-    """Apply a median filter with a square window size."""
+@returns_lists_for_lists
+@cached("median_filter", ignore=("method",))
+def median_filter(image, window, method="auto", border="replicate"):
+    """Apply a median filter with a square window size.
+
+    ``method`` picks the implementation: ``"sort"`` runs a vectorized NumPy
+    selection over a padded uint8 array, ``"histogram"`` keeps running column
+    histograms so the cost per pixel does not grow with the window, and
+    ``"python"`` runs the original per-pixel loop. ``"auto"`` switches to the
+    histogram path from HISTOGRAM_MIN_WINDOW upwards. All return the same pixels.
+    ``border`` is one of ``borders.BORDER_MODES``; the default replicates edges.
+    """
+    if method == "python":
+        return as_image(_median_filter_python(to_lists(as_array(image)), window, border))
+    offset = window // 2
+    size = 2 * offset + 1
+    if method == "auto":
+        method = "histogram" if size >= HISTOGRAM_MIN_WINDOW else "sort"
+    padded = pad_array(as_array(image), offset, border)
+    if method == "sort":
+        return from_array(_median_sort(padded, size))
+    if method == "histogram":
+        return from_array(_median_histogram(padded, size))
+    raise ValueError(f"Unknown median method: {method}")
+
+
+def _row_bands(height, width, taps):
+    """Yield (y0, y1) output row ranges holding about BAND_ELEMENTS values."""
+    band = max(1, BAND_ELEMENTS // (width * taps))
+    for y0 in range(0, height, band):
+        yield y0, min(height, y0 + band)
+
+
+def _window_values(padded, size, y0, y1):
+    """Gather the windows of output rows y0..y1 as (rows, width, size * size)."""
+    width = padded.shape[1] - size + 1
+    view = sliding_window_view(padded[y0:y1 + size - 1], (size, size))
+    return view.reshape(y1 - y0, width, size * size)
+
+
+def _oddeven_merge_pairs(count):
+    """Comparator pairs of Batcher's odd-even merge sort for a power of two."""
+    pairs = []
+    p = 1
+    while p < count:
+        k = p
+        while k >= 1:
+            for j in range(k % p, count - k, 2 * k):
+                for i in range(min(k, count - j - k)):
+                    if (i + j) // (2 * p) == (i + j + k) // (2 * p):
+                        pairs.append((i + j, i + j + k))
+            k //= 2
+        p *= 2
+    return pairs
+
+
+@functools.lru_cache(maxsize=None)
+def _selection_network(taps, ranks):
+    """Return (comparators, slots) selecting the given sorted ranks of ``taps`` values.
+
+    The sorting network is padded to a power of two with virtual +inf inputs,
+    then every comparator that cannot influence one of the requested ranks is
+    dropped. ``slots[i]`` is the plane that ends up holding ``ranks[i]``.
+    """
+    size = 1 << max(0, taps - 1).bit_length()
+    is_max = [wire >= taps for wire in range(size)]
+    slot = list(range(size))
+    comparators = []
+    for i, j in _oddeven_merge_pairs(size):
+        if is_max[j]:
+            continue
+        if is_max[i]:
+            slot[i], slot[j] = slot[j], slot[i]
+            is_max[i], is_max[j] = False, True
+            continue
+        comparators.append((slot[i], slot[j]))
+    needed = {slot[rank] for rank in ranks}
+    kept = []
+    for low, high in reversed(comparators):
+        if low in needed or high in needed:
+            kept.append((low, high))
+            needed.update((low, high))
+    kept.reverse()
+    return tuple(kept), tuple(slot[rank] for rank in ranks)
+
+
+def _tap_planes(padded, size, y0, y1):
+    """Return the size * size shifted views covering output rows y0..y1."""
+    width = padded.shape[1] - size + 1
+    return [
+        padded[y0 + dy:y1 + dy, dx:dx + width]
+        for dy in range(size)
+        for dx in range(size)
+    ]
+
+
+def _network_select(planes, ranks):
+    """Run the pruned selection network over tap planes; return one plane per rank."""
+    comparators, slots = _selection_network(len(planes), tuple(ranks))
+    planes = list(planes)
+    for low, high in comparators:
+        smaller = np.minimum(planes[low], planes[high])
+        planes[high] = np.maximum(planes[low], planes[high])
+        planes[low] = smaller
+    return [planes[slot] for slot in slots]
+
+
+def _plane_sum(planes):
+    """Sum uint8 planes into an int64 plane."""
+    total = np.zeros(planes[0].shape, dtype=np.int64)
+    for plane in planes:
+        total += plane
+    return total
+
+
+def _select_ranks(padded, size, ranks):
+    """Yield (y0, y1, planes) with one plane per requested window rank.
+
+    Small windows run a pruned min/max selection network over whole image
+    planes; larger ones fall back to ``np.partition`` on gathered windows.
+    """
+    height = padded.shape[0] - size + 1
+    width = padded.shape[1] - size + 1
+    taps = size * size
+    if taps <= NETWORK_MAX_TAPS:
+        for y0, y1 in _row_bands(height, width, taps):
+            yield y0, y1, _network_select(_tap_planes(padded, size, y0, y1), ranks)
+        return
+    for y0, y1 in _row_bands(height, width, taps):
+        values = np.partition(_window_values(padded, size, y0, y1), ranks, axis=-1)
+        yield y0, y1, [values[..., rank] for rank in ranks]
+
+
+def _median_sort(padded, size):
+    """Median of every size x size window of a padded uint8 array."""
+    height = padded.shape[0] - size + 1
+    width = padded.shape[1] - size + 1
+    out = np.empty((height, width), dtype=np.uint8)
+    for y0, y1, (median,) in _select_ranks(padded, size, (size * size // 2,)):
+        out[y0:y1] = median
+    return out
+
+
+def _window_histograms(padded, size):
+    """Yield (y, histograms) for each output row of a padded uint8 array.
+
+    ``histograms`` has shape (width, 256) and counts the values of the
+    size x size window centred on each pixel of row ``y``. One histogram per
+    padded column is updated incrementally as the window slides down (one
+    removal and one insertion per column), and the window histograms are
+    read from a running sum across columns, so the work per pixel does not
+    depend on ``size``. Counts use unsigned wrap-around arithmetic, which
+    keeps the running-sum differences exact.
+    """
+    height = padded.shape[0] - size + 1
+    dtype = np.uint16 if size * size < 1 << 16 else np.uint32
+    columns = np.arange(padded.shape[1])
+    flat = (columns * 256 + padded[:size].astype(np.intp)).ravel()
+    column_hist = np.bincount(flat, minlength=padded.shape[1] * 256)
+    column_hist = column_hist.reshape(padded.shape[1], 256).astype(dtype)
+    running = np.zeros((padded.shape[1] + 1, 256), dtype=dtype)
+    for y in range(height):
+        if y:
+            column_hist[columns, padded[y - 1]] -= 1
+            column_hist[columns, padded[y + size - 1]] += 1
+        np.cumsum(column_hist, axis=0, out=running[1:])
+        yield y, running[size:] - running[:-size]
+
+
+def _histogram_rank(histograms, rank):
+    """Return the value at sorted position ``rank`` of every histogram row.
+
+    A 16-bucket coarse pass picks the bucket holding the rank, then only that
+    bucket's 16 fine bins are scanned.
+    """
+    index = np.arange(len(histograms))
+    fine = histograms.reshape(len(histograms), 16, 16)
+    coarse = fine.sum(axis=2, dtype=np.int32)
+    coarse_counts = np.cumsum(coarse, axis=1)
+    bucket = np.argmax(coarse_counts > rank, axis=1)
+    below = coarse_counts[index, bucket] - coarse[index, bucket]
+    fine_counts = np.cumsum(fine[index, bucket], axis=1, dtype=np.int32)
+    fine_counts += below[:, None]
+    return bucket * 16 + np.argmax(fine_counts > rank, axis=1)
+
+
+def _histogram_lowest_sums(histograms, counts):
+    """Return, for each of ``counts``, the sum of that many smallest values per row.
+
+    Coarse bucket counts and sums come from one matrix product shared by all
+    ``counts``; only the single bucket holding each boundary is then scanned.
+    Window histograms hold fewer than 2**16 taps of 8-bit values, so the
+    float32 products are exact.
+    """
+    index = np.arange(len(histograms))
+    dtype = np.float32 if histograms.dtype == np.uint16 else np.float64
+    coarse = (histograms.astype(dtype) @ _BUCKET_WEIGHTS.astype(dtype)).astype(np.int64)
+    coarse_counts = np.cumsum(coarse[:, :16], axis=1)
+    coarse_sums = np.cumsum(coarse[:, 16:], axis=1)
+    fine_hist = histograms.reshape(len(histograms), 16, 16)
+    results = []
+    for count in counts:
+        if count <= 0:
+            results.append(np.zeros(len(histograms), dtype=np.int64))
+            continue
+        bucket = np.argmax(coarse_counts >= count, axis=1)
+        below_count = coarse_counts[index, bucket] - coarse[index, bucket]
+        below_sum = coarse_sums[index, bucket] - coarse[index, 16 + bucket]
+        fine = fine_hist[index, bucket].astype(np.int64)
+        values = bucket[:, None] * 16 + np.arange(16)
+        fine_counts = np.cumsum(fine, axis=1) + below_count[:, None]
+        step = np.argmax(fine_counts >= count, axis=1)
+        fine_sums = np.cumsum(fine * values, axis=1) + below_sum[:, None]
+        before_count = fine_counts[index, step] - fine[index, step]
+        before_sum = fine_sums[index, step] - fine[index, step] * values[index, step]
+        results.append(before_sum + values[index, step] * (count - before_count))
+    return results
+
+
+def _median_histogram(padded, size):
+    """Median of every size x size window using running histograms."""
+    height = padded.shape[0] - size + 1
+    width = padded.shape[1] - size + 1
+    out = np.empty((height, width), dtype=np.uint8)
+    for y, histograms in _window_histograms(padded, size):
+        out[y] = _histogram_rank(histograms, size * size // 2)
+    return out
+
+
+def _median_filter_python(image, window, border="replicate"):
+    """Reference per-pixel median filter on 2D lists."""
     height = len(image)
     width = len(image[0])
     offset = window // 2
+    size = 2 * offset + 1
+    padded = pad_image(image, offset, border)
+    middle = size * size // 2
     filtered = []
     for y in range(height):
+        rows = padded[y:y + size]
         row = []
         for x in range(width):
             values = []
-            for dy in range(-offset, offset + 1):
-                for dx in range(-offset, offset + 1):
-                    values.append(get_pixel_safe(image, y + dy, x + dx))
+            for window_row in rows:
+                values.extend(window_row[x:x + size])
             values.sort()
-            middle = len(values) // 2
             row.append(values[middle])
         filtered.append(row)
     return filtered
 
 
-def mean_filter(image, window):
-    """Apply a simple mean (average) filter."""
+@returns_lists_for_lists
+@cached("adaptive_median_filter")
+def adaptive_median_filter(image, max_window=7, candidates=None, impulse_values=(0, 255), border="replicate"):
+    """Replace impulse pixels only, growing each window until its median is not an impulse.
+
+    Candidates are the pixels whose value is in ``impulse_values`` unless
+    ``candidates`` gives them directly as a ``(ys, xs)`` pair of index arrays,
+    for example the coordinates returned by a noise generator. Every other
+    pixel is copied unchanged, so the cost follows the number of candidates
+    rather than the image area. A candidate takes the median of the smallest
+    window (3x3 up to ``max_window``) whose minimum < median < maximum; if
+    none qualifies, it takes the median of the largest window. Clean pixels
+    that happen to be 0 or 255 are candidates too, so with the default
+    detection they can still be rewritten.
+    """
+    array = as_array(image)
+    filtered = array.copy()
+    if candidates is None:
+        ys, xs = np.nonzero(np.isin(array, impulse_values))
+    else:
+        ys, xs = _candidate_coordinates(candidates)
+    max_offset = max(1, max_window // 2)
+    padded = pad_array(array, max_offset, border)
+    ys = ys + max_offset
+    xs = xs + max_offset
+    for offset in range(1, max_offset + 1):
+        if len(ys) == 0:
+            break
+        dy, dx = np.mgrid[-offset:offset + 1, -offset:offset + 1]
+        values = padded[ys[:, None] + dy.ravel(), xs[:, None] + dx.ravel()]
+        taps = values.shape[1]
+        values = np.partition(values, (0, taps // 2, taps - 1), axis=1)
+        low, median, high = values[:, 0], values[:, taps // 2], values[:, -1]
+        done = (low < median) & (median < high)
+        if offset == max_offset:
+            done[:] = True
+        filtered[ys[done] - max_offset, xs[done] - max_offset] = median[done]
+        ys = ys[~done]
+        xs = xs[~done]
+    return from_array(filtered)
+
+
+def _candidate_coordinates(candidates):
+    """Return (ys, xs) index arrays from a ``(ys, xs)`` pair of 1D sequences."""
+    if len(candidates) != 2:
+        raise ValueError("candidates must be a (ys, xs) pair of index arrays.")
+    ys = np.asarray(candidates[0], dtype=np.intp)
+    xs = np.asarray(candidates[1], dtype=np.intp)
+    if ys.ndim != 1 or ys.shape != xs.shape:
+        raise ValueError("candidates must be a (ys, xs) pair of equal-length 1D index arrays.")
+    return ys, xs
+
+
+@returns_lists_for_lists
+@cached("mean_filter", ignore=("method",))
+def mean_filter(image, window, method="integral", border="replicate"):
+    """Apply a simple mean (average) filter.
+
+    ``method`` picks the implementation: ``"integral"`` reads every window sum
+    from a summed-area table (constant work per pixel for any window size),
+    ``"python"`` runs the original per-pixel loop. Both floor-divide the window
+    sum by the tap count and return the same pixels. ``border`` works as in
+    ``median_filter``.
+    """
+    if method == "python":
+        return as_image(_mean_filter_python(to_lists(as_array(image)), window, border))
+    if method != "integral":
+        raise ValueError(f"Unknown mean method: {method}")
+    offset = window // 2
+    padded = pad_array(as_array(image), offset, border)
+    return from_array(_mean_integral(padded, 2 * offset + 1))
+
+
+def _mean_integral(padded, size):
+    """Floor mean of every size x size window of a padded array."""
+    return (box_sum(padded, size) // (size * size)).astype(np.uint8)
+
+
+def _mean_filter_python(image, window, border="replicate"):
+    """Reference per-pixel mean filter on 2D lists."""
     height = len(image)
     width = len(image[0])
     offset = window // 2
+    size = 2 * offset + 1
+    padded = pad_image(image, offset, border)
+    count = size * size
     filtered = []
     for y in range(height):
+        rows = padded[y:y + size]
         row = []
         for x in range(width):
             total = 0
-            count = 0
-            for dy in range(-offset, offset + 1):
-                for dx in range(-offset, offset + 1):
-                    total += get_pixel_safe(image, y + dy, x + dx)
-                    count += 1
+            for window_row in rows:
+                total += sum(window_row[x:x + size])
             row.append(total // count)
         filtered.append(row)
     return filtered
 
 
-def trimmed_alpha_filter(image, window, trim_amount):
-    """Apply a trimmed alpha filter by cutting extremes before averaging."""
+@returns_lists_for_lists
+@cached("trimmed_alpha_filter", ignore=("method",))
+def trimmed_alpha_filter(image, window, trim_amount, method="auto", border="replicate"):
+    """Apply a trimmed alpha filter by cutting extremes before averaging.
+
+    ``method`` picks the implementation: ``"sort"`` selects the kept ranks
+    with a vectorized selection network, ``"histogram"`` reads the trimmed sum
+    from running window histograms without sorting, ``"python"`` runs the
+    original per-pixel loop, and ``"auto"`` chooses by window size like
+    ``median_filter``. All return the same pixels. ``border`` works as in
+    ``median_filter``.
+    """
+    if method == "python":
+        return as_image(_trimmed_alpha_filter_python(to_lists(as_array(image)), window, trim_amount, border))
+    offset = window // 2
+    size = 2 * offset + 1
+    if method == "auto":
+        method = "histogram" if size >= HISTOGRAM_MIN_WINDOW else "sort"
+    padded = pad_array(as_array(image), offset, border)
+    if method == "sort":
+        return from_array(_trimmed_alpha_sort(padded, size, trim_amount))
+    if method == "histogram":
+        return from_array(_trimmed_alpha_histogram(padded, size, trim_amount))
+    raise ValueError(f"Unknown trimmed alpha method: {method}")
+
+
+def _trim_bounds(taps, trim_amount):
+    """Return the kept [start, end) rank range, keeping all taps if over-trimmed."""
+    start = trim_amount
+    end = taps - trim_amount
+    if start >= end:
+        return 0, taps
+    return start, end
+
+
+def _trimmed_alpha_sort(padded, size, trim_amount):
+    """Trimmed mean of every window using a selection network."""
+    height = padded.shape[0] - size + 1
+    width = padded.shape[1] - size + 1
+    start, end = _trim_bounds(size * size, trim_amount)
+    out = np.empty((height, width), dtype=np.uint8)
+    for y0, y1, planes in _select_ranks(padded, size, tuple(range(start, end))):
+        out[y0:y1] = _plane_sum(planes) // (end - start)
+    return out
+
+
+def _trimmed_alpha_histogram(padded, size, trim_amount):
+    """Trimmed mean of every window read from running histograms."""
+    height = padded.shape[0] - size + 1
+    width = padded.shape[1] - size + 1
+    start, end = _trim_bounds(size * size, trim_amount)
+    out = np.empty((height, width), dtype=np.uint8)
+    for y, histograms in _window_histograms(padded, size):
+        lowest_start, lowest_end = _histogram_lowest_sums(histograms, (start, end))
+        out[y] = (lowest_end - lowest_start) // (end - start)
+    return out
+
+
+def _trimmed_alpha_filter_python(image, window, trim_amount, border="replicate"):
+    """Reference per-pixel trimmed alpha filter on 2D lists."""
     height = len(image)
     width = len(image[0])
     offset = window // 2
+    size = 2 * offset + 1
+    padded = pad_image(image, offset, border)
+    start, end = _trim_bounds(size * size, trim_amount)
     filtered = []
     for y in range(height):
+        rows = padded[y:y + size]
         row = []
         for x in range(width):
             values = []
-            for dy in range(-offset, offset + 1):
-                for dx in range(-offset, offset + 1):
-                    values.append(get_pixel_safe(image, y + dy, x + dx))
+            for window_row in rows:
+                values.extend(window_row[x:x + size])
             values.sort()
-            start = trim_amount
-            end = len(values) - trim_amount
-            if start >= end:
-                start = 0
-                end = len(values)
-            total = 0
-            count = 0
-            for i in range(start, end):
-                total += values[i]
-                count += 1
-            if count == 0:
-                row.append(values[len(values) // 2])
-            else:
-                row.append(total // count)
+            row.append(sum(values[start:end]) // (end - start))
         filtered.append(row)
     return filtered
 
 
-def contra_harmonic_filter(image, window, Q):
-    """Apply a contra-harmonic filter."""
+@returns_lists_for_lists
+@cached("contra_harmonic_filter", ignore=("method",))
+def contra_harmonic_filter(image, window, Q, method="lut", border="replicate"):
+    """Apply a contra-harmonic filter.
+
+    ``method`` picks the implementation: ``"lut"`` looks up ``value ** (Q + 1)``
+    and ``value ** Q`` in 256-entry tables and box-sums the two planes,
+    ``"python"`` runs the original per-pixel loop. For negative Q a zero pixel
+    sends both sums to infinity, so any window containing a zero yields 0 (the
+    limit of the ratio). Ratios within float error of an integer are snapped
+    to it before truncation, so a flat window of value v stays v. ``border``
+    works as in ``median_filter``.
+    """
+    if method == "python":
+        return as_image(_contra_harmonic_filter_python(to_lists(as_array(image)), window, Q, border))
+    if method != "lut":
+        raise ValueError(f"Unknown contra-harmonic method: {method}")
+    offset = window // 2
+    padded = pad_array(as_array(image), offset, border)
+    return from_array(_contra_harmonic_lut(padded, 2 * offset + 1, Q))
+
+
+def _power_tables(Q, taps):
+    """Return (numerator, denominator) lookup tables of v ** (Q + 1) and v ** Q.
+
+    Non-negative integer Q uses int64 tables whose window sums stay exact;
+    other Q use float64 tables with the zero entry cleared for negative Q.
+    """
+    values = np.arange(256, dtype=np.int64)
+    if float(Q).is_integer() and Q >= 0 and taps * 255 ** (int(Q) + 1) < 2 ** 53:
+        power = int(Q)
+        return values ** (power + 1), values ** power
+    values = values.astype(np.float64)
+    with np.errstate(divide="ignore"):
+        numerator = values ** (Q + 1)
+        denominator = values ** Q
+    if Q < 0:
+        numerator[0] = 0.0
+        denominator[0] = 0.0
+    return numerator, denominator
+
+
+def _contra_harmonic_lut(padded, size, Q):
+    """Contra-harmonic mean of every window from lookup tables and box sums."""
+    height = padded.shape[0] - size + 1
+    width = padded.shape[1] - size + 1
+    offset = size // 2
+    numerator_lut, denominator_lut = _power_tables(Q, size * size)
+    window_sum = box_sum if numerator_lut.dtype == np.int64 else separable_box_sum
+    out = np.empty((height, width), dtype=np.uint8)
+    for y0, y1 in _row_bands(height, width, 16):
+        band = padded[y0:y1 + size - 1]
+        numerator = window_sum(numerator_lut[band], size)
+        denominator = window_sum(denominator_lut[band], size)
+        center = band[offset:offset + y1 - y0, offset:offset + width]
+        has_zero = box_sum((band == 0).astype(np.int32), size) > 0 if Q < 0 else None
+        result = _contra_result(numerator, denominator, center, has_zero)
+        out[y0:y1] = result
+    return out
+
+
+def _contra_result(numerator, denominator, center, has_zero):
+    """Turn window sums into contra-harmonic pixels (snap, truncate, fall back)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = numerator / denominator
+    nearest = np.rint(ratio)
+    close = np.abs(ratio - nearest) <= RATIO_TOLERANCE * np.maximum(nearest, 1)
+    ratio = np.floor(np.clip(np.where(close, nearest, ratio), 0, 255))
+    result = np.where(denominator == 0, center, ratio)
+    if has_zero is not None:
+        result[has_zero] = 0
+    return result
+
+
+def _contra_harmonic_filter_python(image, window, Q, border="replicate"):
+    """Reference per-pixel contra-harmonic filter on 2D lists."""
     height = len(image)
     width = len(image[0])
     offset = window // 2
+    size = 2 * offset + 1
+    padded = pad_image(image, offset, border)
     filtered = []
     for y in range(height):
+        rows = padded[y:y + size]
         row = []
         for x in range(width):
             numerator = 0.0
             denominator = 0.0
-            for dy in range(-offset, offset + 1):
-                for dx in range(-offset, offset + 1):
-                    value = get_pixel_safe(image, y + dy, x + dx)
+            has_zero = False
+            for window_row in rows:
+                for value in window_row[x:x + size]:
+                    if value == 0 and Q < 0:
+                        has_zero = True
+                        continue
                     numerator += value ** (Q + 1)
                     denominator += value ** Q
-            if denominator == 0:
-                row.append(get_pixel_safe(image, y, x))
+            if has_zero:
+                row.append(0)
+            elif denominator == 0:
+                row.append(image[y][x])
             else:
-                row.append(clamp_pixel(numerator / denominator))
+                row.append(clamp_pixel(_snap_ratio(numerator / denominator)))
         filtered.append(row)
     return filtered
+
+
+def _snap_ratio(ratio):
+    """Round a ratio to the nearest integer when it only misses it by float error."""
+    nearest = round(ratio)
+    if abs(ratio - nearest) <= RATIO_TOLERANCE * max(nearest, 1):
+        return nearest
+    return ratio
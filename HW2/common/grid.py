@@ -0,0 +1,108 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import filters, image_io, metrics, noise, results_store
+
+# How a grid noise level maps onto each generator's arguments after the image.
+NOISE_LEVEL_PARAMS = {
+    "salt_and_pepper": lambda level: (level,),
+    "salt": lambda level: (level,),
+    "pepper": lambda level: (level,),
+    "gaussian": lambda level: (0, level),
+    "uniform": lambda level: (-level, level),
+}
+
+
+def expand_grid(grid):
+    """List every cell of a declarative experiment grid.
+
+    ``grid`` is a dict (e.g. loaded from JSON) such as::
+
+        {
+            "images": ["lena.png"],
+            "noise": {"salt_and_pepper": [0.01, 0.05], "gaussian": [10]},
+            "filters": {
+                "median": {"windows": [3, 5]},
+                "trimmed_alpha": {"windows": [3], "params": [[1], [2]]},
+            },
+            "seed": 0,
+        }
+
+    Noise levels are the noise level for salt/pepper kinds, the standard
+    deviation for ``gaussian`` and the half range for ``uniform``. Each cell
+    is a dict with ``image``, ``noise``, ``level``, ``filter``, ``window``,
+    ``params`` and ``seed``.
+    """
+    cells = []
+    for image in grid["images"]:
+        for noise_kind, levels in grid["noise"].items():
+            for level in levels:
+                for filter_kind, options in grid["filters"].items():
+                    for window in options["windows"]:
+                        for params in options.get("params", [[]]):
+                            cells.append({
+                                "image": image,
+                                "noise": noise_kind,
+                                "level": level,
+                                "filter": filter_kind,
+                                "window": window,
+                                "params": list(params),
+                                "seed": grid.get("seed", 0),
+                            })
+    return cells
+
+
+def run_grid(grid, results_path, workers=None):
+    """Run every grid cell not yet in the ``results_path`` database on a process pool.
+
+    Cells sharing an image, noise kind and level form one job, so the noisy
+    image is made once (with ``noise.add_tiled_noise`` and the grid seed, so
+    reruns draw the same noise) and all of its filters share one
+    ``filters.filter_bank`` pass. Each finished job's rows are committed to
+    the ``results_store`` database straight away as a new ``grid`` run;
+    rerunning after an interruption skips every cell already recorded.
+    Returns ``(ran, skipped)`` cell counts.
+    """
+    connection = results_store.open_store(results_path)
+    completed = results_store.completed_keys(connection)
+    jobs = {}
+    skipped = 0
+    for cell in expand_grid(grid):
+        if results_store.cell_key(cell) in completed:
+            skipped += 1
+            continue
+        group = (cell["image"], cell["noise"], cell["level"], cell["seed"])
+        jobs.setdefault(group, []).append(cell)
+    ran = 0
+    if not jobs:
+        connection.close()
+        return ran, skipped
+    run_id = results_store.start_run(connection, "grid")
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_cells, cells) for cells in jobs.values()]
+            for future in as_completed(futures):
+                rows = future.result()
+                results_store.insert_rows(connection, run_id, rows)
+                ran += len(rows)
+    finally:
+        connection.close()
+    return ran, skipped
+
+
+def run_cells(cells):
+    """Score cells that share an image, noise kind, level and seed; return result rows."""
+    first = cells[0]
+    original = image_io.load_grayscale_image(first["image"])
+    params = NOISE_LEVEL_PARAMS[first["noise"]](first["level"])
+    noisy = noise.add_tiled_noise(original, first["noise"], *params, seed=first["seed"])
+    specs = [(cell["filter"], cell["window"], *cell["params"]) for cell in cells]
+    outputs = filters.filter_bank(noisy, specs)
+    quality = metrics.quality_scores(original, outputs)
+    rows = []
+    for cell, filtered, scores in zip(cells, outputs, quality):
+        table = metrics.confusion_table(original, noisy, filtered)
+        row = dict(cell)
+        row.update({name: table[name] for name in ("noisy", "fixed", "unfixed", "damaged", "untouched")})
+        row.update(scores)
+        rows.append(row)
+    return rows
@@ -0,0 +1,90 @@
+import functools
+
+import numpy as np
+
+
+class GrayImage(np.ndarray):
+    """An 8-bit grayscale image stored as one contiguous uint8 buffer.
+
+    ``len(image)`` is the height, ``image[y][x]`` is a pixel and ``for row
+    in image`` walks the rows, as with the 2D lists it replaces. It is not a
+    drop-in list, though: pixels are ``numpy.uint8`` (arithmetic wraps at
+    256), ``==`` compares elementwise and truth testing raises. Use
+    ``to_lists`` where list semantics are needed. Being a NumPy array it
+    exposes the buffer protocol and costs one byte per pixel.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, data):
+        array = np.ascontiguousarray(to_uint8(data))
+        if array.ndim != 2:
+            raise ValueError("Grayscale images must be 2D.")
+        return array.view(cls)
+
+    def __getitem__(self, index):
+        # Rows and other slices that are not 2D are plain arrays, not images
+        item = super().__getitem__(index)
+        if isinstance(item, GrayImage) and item.ndim != 2:
+            return item.view(np.ndarray)
+        return item
+
+    def __iter__(self):
+        return iter(self.view(np.ndarray))
+
+    @property
+    def height(self):
+        return self.shape[0]
+
+    @property
+    def width(self):
+        return self.shape[1]
+
+
+def as_image(data):
+    """Return ``data`` (a GrayImage, array or 2D list) as a GrayImage.
+
+    A 2D uint8 GrayImage is returned as is. NumPy operations keep the
+    subclass, so other GrayImages (say after ``astype(float)``) are converted
+    like any other input.
+    """
+    if isinstance(data, GrayImage) and data.dtype == np.uint8 and data.ndim == 2:
+        return data
+    return GrayImage(data)
+
+
+def to_uint8(data):
+    """Return pixel values as a uint8 array, truncating and clamping them to 0-255.
+
+    Matches ``utils.clamp_pixel``, so out-of-range values saturate instead of
+    wrapping around. uint8 arrays are returned without a copy.
+    """
+    array = np.asarray(data)
+    if array.dtype == np.uint8:
+        return array
+    if array.dtype.kind == "f":
+        array = np.trunc(array)
+    return np.clip(array, 0, 255).astype(np.uint8)
+
+
+def returns_lists_for_lists(function):
+    """Decorate a function of an image so 2D-list input gets a 2D list of ints back.
+
+    Keeps callers written against the original list-based API working; array
+    and GrayImage input still gets a GrayImage.
+    """
+    @functools.wraps(function)
+    def wrapper(image, *args, **kwargs):
+        result = function(image, *args, **kwargs)
+        if isinstance(image, np.ndarray):
+            return result
+        return to_lists(result)
+
+    return wrapper
+
+
+def to_lists(image):
+    """Return a new 2D list of ints for callers that need plain lists."""
+    if isinstance(image, np.ndarray):
+        return image.tolist()
+    return [list(row) for row in image]
@@ -1,30 +1,94 @@
+import contextlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 from PIL import Image
 
+from .image import as_image
+
+# Serializes the temporary change of Pillow's global pixel limit in open_image.
+_open_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def open_image(path, max_pixels=None):
+    """Open an image file with Pillow, allowing up to ``max_pixels`` pixels.
+
+    Pillow refuses images above ``Image.MAX_IMAGE_PIXELS`` (about 179 MP) as
+    possible decompression bombs, which rules out the large scans these tools
+    are meant for. The limit is lifted only while this call opens the file;
+    ``None`` means no limit, so pass a number for untrusted input.
+    """
+    with _open_lock:
+        previous = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = max_pixels
+        try:
+            image = Image.open(path)
+        finally:
+            Image.MAX_IMAGE_PIXELS = previous
+    with image:
+        yield image
+
 
 def load_grayscale_image(path):
-    """Load an image file and return a 2D list of grayscale pixel values."""
-    image = Image.open(path).convert("L")
-    width, height = image.size
-    pixels = image.load()
-    data = []
-    for y in range(height):
-        row = []
-        for x in range(width):
-            row.append(pixels[x, y])
-        data.append(row)
-    return data
+    """Load an image file and return its grayscale pixels as a GrayImage.
 
+    ``.npy`` image stores (see ``image_store``) are read directly.
+    """
+    if os.fspath(path).lower().endswith(".npy"):
+        return as_image(np.load(path))
+    with open_image(path) as image:
+        return as_image(np.array(image.convert("L"), dtype=np.uint8))
 
-def save_grayscale_image(pixels, path):
-    """Save a 2D list of grayscale values to an image file."""
-    if not pixels:
+
+def load_grayscale_images(paths, workers=None):
+    """Load several image files at once and return their GrayImages in order.
+
+    Decoding runs on a thread pool; Pillow releases the GIL while it decodes.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(load_grayscale_image, paths))
+
+
+def to_pil_image(pixels):
+    """Build an 8-bit Pillow image from a GrayImage or 2D list, clamping values to 0-255."""
+    if len(pixels) == 0:
         raise ValueError("Pixel data is empty.")
-    height = len(pixels)
-    width = len(pixels[0])
-    image = Image.new("L", (width, height))
-    for y in range(height):
-        for x in range(width):
-            value = int(pixels[y][x])
-            value = max(0, min(255, value))
-            image.putpixel((x, y), value)
+    array = np.asarray(pixels)
+    if array.dtype != np.uint8:
+        array = np.clip(np.trunc(array), 0, 255).astype(np.uint8)
+    height, width = array.shape
+    return Image.frombytes("L", (width, height), np.ascontiguousarray(array).tobytes())
+
+
+def save_grayscale_image(pixels, path):
+    """Save a GrayImage or 2D list of grayscale values to an image file.
+
+    Paths ending in ``.npy`` are written as image stores that can later be
+    memory-mapped with ``image_store.open_image_store``.
+    """
+    image = to_pil_image(pixels)
+    if os.fspath(path).lower().endswith(".npy"):
+        np.save(path, np.asarray(image))
+        return
     image.save(path)
+
+
+def save_heatmap_overlay(pixels, heatmap, path, tile_size, alpha=0.6):
+    """Save an RGB image of ``pixels`` tinted red by a per-tile heatmap.
+
+    ``heatmap`` holds one value per tile_size x tile_size tile (e.g.
+    ``metrics.tile_fraction``), with edge tiles clipped to the image. Values
+    are scaled so the largest cell gets the full ``alpha`` tint.
+    """
+    base = np.asarray(to_pil_image(pixels), dtype=np.float64)
+    height, width = base.shape
+    heatmap = np.asarray(heatmap, dtype=np.float64)
+    strength = heatmap.repeat(tile_size, axis=0).repeat(tile_size, axis=1)[:height, :width]
+    peak = strength.max()
+    if peak > 0:
+        strength = alpha * strength / peak
+    rgb = np.stack([base * (1 - strength) + 255 * strength, base * (1 - strength), base * (1 - strength)], axis=-1)
+    Image.fromarray(rgb.astype(np.uint8), "RGB").save(path)
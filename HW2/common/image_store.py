@@ -0,0 +1,75 @@
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from .borders import padded_band
+from .filters import filter_padded
+from .image_io import open_image
+
+# Rows copied or filtered per step when streaming through a store.
+STORE_BAND_ROWS = 256
+
+
+def create_image_store(path, height, width):
+    """Create a zero-filled ``.npy`` uint8 image on disk and return it memory-mapped."""
+    return open_memmap(path, mode="w+", dtype=np.uint8, shape=(height, width))
+
+
+def open_image_store(path, mode="r"):
+    """Memory-map an ``.npy`` image store; pass ``mode="r+"`` to write into it."""
+    store = np.load(path, mmap_mode=mode)
+    if store.dtype != np.uint8 or store.ndim != 2:
+        raise ValueError(f"{path} is not a 2D uint8 image store.")
+    return store
+
+
+def convert_to_store(image_path, store_path, band_rows=STORE_BAND_ROWS):
+    """Decode an image file once into grayscale and save it as an ``.npy`` store.
+
+    Pillow holds the decoded 8-bit image while its rows are copied over in
+    bands; later runs map the store instead of decoding again.
+    """
+    with open_image(image_path) as image:
+        gray = image.convert("L")
+        width, height = gray.size
+        store = create_image_store(store_path, height, width)
+        for y0, y1 in _bands(height, band_rows):
+            rows = gray.crop((0, y0, width, y1)).tobytes()
+            store[y0:y1] = np.frombuffer(rows, dtype=np.uint8).reshape(y1 - y0, width)
+    store.flush()
+    return store
+
+
+def iter_row_bands(store, band_rows=STORE_BAND_ROWS):
+    """Yield (y0, rows) for consecutive bands of a store, read on demand."""
+    for y0, y1 in _bands(store.shape[0], band_rows):
+        yield y0, np.asarray(store[y0:y1])
+
+
+def read_tile(store, y0, y1, x0, x1):
+    """Copy one rectangular tile out of a store."""
+    return np.array(store[y0:y1, x0:x1])
+
+
+def filter_store(source, target, kind, window, *params, band_rows=STORE_BAND_ROWS, border="replicate"):
+    """Filter one store into another band by band.
+
+    ``source`` and ``target`` are memory-mapped arrays of the same shape (or any
+    2D uint8 arrays). Each band reads its rows plus a ``window // 2`` halo, so
+    neither image is ever fully loaded. ``kind`` and ``params`` are as in
+    ``filters.filter_padded``.
+    """
+    if source.shape != target.shape:
+        raise ValueError("Source and target stores must have the same shape.")
+    offset = window // 2
+    for y0, y1 in _bands(source.shape[0], band_rows):
+        band = padded_band(source, y0, y1, offset, border)
+        target[y0:y1] = filter_padded(band, kind, window, *params)
+    if isinstance(target, np.memmap):
+        target.flush()
+    return target
+
+
+def _bands(height, band_rows):
+    """Yield (y0, y1) ranges of at most ``band_rows`` rows."""
+    for y0 in range(0, height, band_rows):
+        yield y0, min(height, y0 + band_rows)
@@ -0,0 +1,49 @@
+import numpy as np
+
+
+def integral_image(array, dtype=np.int64):
+    """Return the summed-area table of a 2D array.
+
+    The table has one extra leading row and column of zeros, so the sum of
+    ``array[y0:y1, x0:x1]`` is ``t[y1, x1] - t[y0, x1] - t[y1, x0] + t[y0, x0]``.
+    """
+    height, width = array.shape
+    table = np.zeros((height + 1, width + 1), dtype=dtype)
+    np.cumsum(array, axis=0, dtype=dtype, out=table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+    return table
+
+
+def box_sum(array, size, table=None):
+    """Sum every size x size block of a 2D array in constant time per block.
+
+    Returns an array of shape (height - size + 1, width - size + 1) whose entry
+    at (y, x) is the sum of ``array[y:y + size, x:x + size]``. Pass a
+    precomputed ``table`` from ``integral_image`` to reuse it across calls.
+    """
+    if table is None:
+        table = integral_image(array)
+    return (
+        table[size:, size:]
+        - table[:-size, size:]
+        - table[size:, :-size]
+        + table[:-size, :-size]
+    )
+
+
+def separable_box_sum(array, size):
+    """Sum every size x size block by adding shifted rows, then shifted columns.
+
+    Costs O(size) per block instead of O(1), but each sum only depends on its
+    own block, so float results do not drift with the image size or with the
+    origin of the band being processed.
+    """
+    height = array.shape[0] - size + 1
+    width = array.shape[1] - size + 1
+    rows = array[:height].copy()
+    for dy in range(1, size):
+        rows += array[dy:dy + height]
+    total = rows[:, :width].copy()
+    for dx in range(1, size):
+        total += rows[:, dx:dx + width]
+    return total
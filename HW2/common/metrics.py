@@ -1,36 +1,254 @@
+import numpy as np
+
+from .arrays import as_array, from_array
+from .borders import padded_band
+from .filters import filter_padded
+from .integral import box_sum, integral_image
+
+
 def count_noisy_pixels(f, g):
     """Count pixels that changed from f to g."""
-    noisy = 0
-    height = len(f)
-    width = len(f[0])
-    for y in range(height):
-        for x in range(width):
-            if g[y][x] != f[y][x]:
-                noisy += 1
-    return noisy
+    return int(np.count_nonzero(as_array(g) != as_array(f)))
 
 
 def count_fixed_noisy_pixels(f, g, k):
     """Count noisy pixels fixed by k."""
-    fixed = 0
-    height = len(f)
-    width = len(f[0])
-    for y in range(height):
-        for x in range(width):
-            was_noisy = g[y][x] != f[y][x]
-            if was_noisy and k[y][x] == f[y][x]:
-                fixed += 1
-    return fixed
+    return confusion_table(f, g, k)["fixed"]
 
 
 def count_damaged_clean_pixels(f, g, k):
     """Count clean pixels that were changed by k."""
-    damaged = 0
-    height = len(f)
-    width = len(f[0])
-    for y in range(height):
-        for x in range(width):
-            was_clean = g[y][x] == f[y][x]
-            if was_clean and k[y][x] != f[y][x]:
-                damaged += 1
-    return damaged
+    return confusion_table(f, g, k)["damaged"]
+
+
+# Outcome of each pixel, indexed by 2 * (g != f) + (k == f).
+CONFUSION_CLASSES = ("damaged", "untouched", "unfixed", "fixed")
+
+# Default side of the square tiles that per-tile heatmaps are counted over.
+HEATMAP_TILE = 64
+
+
+def confusion_table(f, g, k, masks=False, tile_size=None):
+    """Count the outcome of every pixel of clean f, noisy g and filtered k in one pass.
+
+    Returns a dict with ``noisy`` (g != f), ``fixed`` (noisy, k == f),
+    ``unfixed`` (noisy, k != f), ``damaged`` (clean, k != f) and
+    ``untouched`` (clean, k == f) counts. With ``masks=True`` it also holds
+    ``masks``, one ``np.packbits`` row-packed boolean mask per class; use
+    ``unpack_mask`` to expand one. With ``tile_size`` set it also holds
+    ``tiles``, the per-tile counts from ``tile_counts``; the totals are then
+    summed from the tiles, so both come out of the same pass.
+    """
+    codes = outcome_codes(f, g, k)
+    if tile_size:
+        tiles = tile_counts(codes, tile_size)
+        table = _table_from_tally(tiles.sum(axis=(0, 1)))
+        table["tiles"] = tiles
+    else:
+        table = _count_codes(codes)
+    if masks:
+        table["masks"] = {name: np.packbits(codes == code, axis=-1) for code, name in enumerate(CONFUSION_CLASSES)}
+        table["masks"]["noisy"] = np.packbits(codes >= 2, axis=-1)
+    return table
+
+
+def outcome_codes(f, g, k):
+    """Return the per-pixel index into CONFUSION_CLASSES as a uint8 array."""
+    clean = as_array(f)
+    codes = (as_array(g) != clean).view(np.uint8) << 1
+    codes |= as_array(k) == clean
+    return codes
+
+
+def add_confusion(counts, f, g, k, y0=0, tile_size=None):
+    """Add the confusion counts of f, g and k (or of bands of them) to ``counts``.
+
+    Bands may be passed one after another, starting at image row ``y0``. With
+    ``tile_size`` set, ``counts["tiles"]`` gathers per-tile counts and grows
+    as rows arrive, so it only ever holds one entry per tile.
+    """
+    codes = outcome_codes(f, g, k)
+    if codes.ndim == 1:
+        codes = codes[None]
+    if tile_size:
+        band_tiles = tile_counts(codes, tile_size, y0)
+        tally = band_tiles.sum(axis=(0, 1))
+        first = y0 // tile_size
+        tiles = counts.get("tiles")
+        if tiles is None:
+            tiles = np.zeros((0,) + band_tiles.shape[1:], dtype=np.int64)
+        if len(tiles) < first + len(band_tiles):
+            missing = first + len(band_tiles) - len(tiles)
+            tiles = np.concatenate([tiles, np.zeros((missing,) + tiles.shape[1:], dtype=np.int64)])
+        tiles[first:first + len(band_tiles)] += band_tiles
+        counts["tiles"] = tiles
+        band = _table_from_tally(tally)
+    else:
+        band = _count_codes(codes)
+    for name, count in band.items():
+        counts[name] = counts.get(name, 0) + count
+    return counts
+
+
+def tile_counts(codes, tile_size=HEATMAP_TILE, y0=0):
+    """Count outcome codes per tile of a band of rows starting at image row ``y0``.
+
+    Returns an int64 array of shape (tile rows, tile columns, 4) indexed by
+    CONFUSION_CLASSES, covering the tile rows the band touches. Edge tiles
+    are clipped to the image.
+    """
+    rows, width = codes.shape
+    tiles_x = -(-width // tile_size)
+    tile_rows = (y0 + np.arange(rows)) // tile_size - y0 // tile_size
+    tiles_y = int(tile_rows[-1]) + 1 if rows else 0
+    cells = tile_rows[:, None] * tiles_x + np.arange(width) // tile_size
+    index = cells * len(CONFUSION_CLASSES) + codes
+    tally = np.bincount(index.reshape(-1), minlength=tiles_y * tiles_x * len(CONFUSION_CLASSES))
+    return tally.reshape(tiles_y, tiles_x, len(CONFUSION_CLASSES))
+
+
+def tile_fraction(tiles, name):
+    """Share of each tile's pixels in class ``name`` (or ``"noisy"``) as a float map."""
+    if name == "noisy":
+        selected = tiles[..., CONFUSION_CLASSES.index("fixed")] + tiles[..., CONFUSION_CLASSES.index("unfixed")]
+    else:
+        selected = tiles[..., CONFUSION_CLASSES.index(name)]
+    return selected / np.maximum(tiles.sum(axis=-1), 1)
+
+
+def unpack_mask(packed, width):
+    """Expand a row-packed mask from ``confusion_table`` back to booleans."""
+    return np.unpackbits(packed, axis=-1, count=width).view(bool)
+
+
+def _count_codes(codes):
+    """Tally outcome codes into a confusion dict."""
+    return _table_from_tally(np.bincount(codes.reshape(-1), minlength=len(CONFUSION_CLASSES)))
+
+
+def _table_from_tally(tally):
+    """Build a confusion dict from per-class totals indexed by CONFUSION_CLASSES."""
+    table = {name: int(tally[code]) for code, name in enumerate(CONFUSION_CLASSES)}
+    table["noisy"] = table["fixed"] + table["unfixed"]
+    return table
+
+
+# Output rows filtered and scored per step by filter_and_score.
+SCORE_BAND_ROWS = 256
+
+
+def filter_and_score(f, g, kind, window, *params, keep_image=False, tile_size=None, border="replicate"):
+    """Filter g and count the outcome per pixel without building the filtered image.
+
+    ``kind``, ``window`` and ``params`` are as in ``filters.filter_padded``.
+    Bands of SCORE_BAND_ROWS rows are filtered and compared with f and g
+    straight away, so the filtered image only exists when ``keep_image`` is
+    set. Returns a dict with ``noisy``, ``fixed``, ``unfixed``, ``damaged``
+    and ``untouched`` counts, plus ``image`` when ``keep_image`` is set and
+    per-tile ``tiles`` (see ``tile_counts``) when ``tile_size`` is set.
+    """
+    clean = as_array(f)
+    noisy = as_array(g)
+    height = noisy.shape[0]
+    offset = window // 2
+    counts = {"noisy": 0, "fixed": 0, "unfixed": 0, "damaged": 0, "untouched": 0}
+    kept = np.empty_like(noisy) if keep_image else None
+    for y0 in range(0, height, SCORE_BAND_ROWS):
+        y1 = min(height, y0 + SCORE_BAND_ROWS)
+        band = padded_band(noisy, y0, y1, offset, border)
+        filtered = filter_padded(band, kind, window, *params)
+        add_confusion(counts, clean[y0:y1], noisy[y0:y1], filtered, y0, tile_size)
+        if keep_image:
+            kept[y0:y1] = filtered
+    if keep_image:
+        counts["image"] = from_array(kept)
+    return counts
+
+
+# Side of the square window SSIM compares local statistics over.
+SSIM_WINDOW = 7
+# SSIM stabilising constants (K1 = 0.01, K2 = 0.03) for a 0..255 range.
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+
+def mean_squared_error(f, k):
+    """Mean squared difference between clean f and filtered k."""
+    diff = as_array(k).astype(np.int64) - as_array(f)
+    return float(np.vdot(diff, diff)) / diff.size
+
+
+def psnr(f, k, peak=255.0):
+    """Peak signal-to-noise ratio of k against f in dB; inf when they are equal."""
+    return _psnr(mean_squared_error(f, k), peak)
+
+
+def ssim(f, k, window=SSIM_WINDOW, full=False):
+    """Mean structural similarity of k against f over window x window boxes.
+
+    Local means, variances and the covariance come from integral images, so
+    the cost per pixel does not depend on ``window``. Only windows that fit
+    inside the image are scored. With ``full=True`` returns ``(mean, map)``.
+    """
+    reference = _reference_stats(f, window)
+    ssim_map = _ssim_map(reference, as_array(k))
+    mean = float(ssim_map.mean())
+    return (mean, ssim_map) if full else mean
+
+
+def quality_scores(f, candidates, window=SSIM_WINDOW):
+    """Score many filtered images against one clean image.
+
+    The integral images of f are built once and reused for every candidate.
+    Returns one dict per candidate with ``mse``, ``psnr`` and ``ssim``.
+    """
+    reference = _reference_stats(f, window)
+    scores = []
+    for candidate in candidates:
+        candidate = as_array(candidate)
+        diff = candidate.astype(np.int64) - reference["array"]
+        mse = float(np.vdot(diff, diff)) / diff.size
+        scores.append({
+            "mse": mse,
+            "psnr": _psnr(mse, 255.0),
+            "ssim": float(_ssim_map(reference, candidate).mean()),
+        })
+    return scores
+
+
+def _psnr(mse, peak):
+    """PSNR in dB from a mean squared error."""
+    return float("inf") if mse == 0 else float(10 * np.log10(peak * peak / mse))
+
+
+def _reference_stats(f, window):
+    """Window sums of f and f**2 for SSIM, plus the int64 pixels themselves."""
+    array = as_array(f).astype(np.int64)
+    size = max(1, min(window, *array.shape))
+    return {
+        "array": array,
+        "size": size,
+        "sum": box_sum(array, size, integral_image(array)),
+        "square_sum": box_sum(array * array, size),
+    }
+
+
+def _ssim_map(reference, k):
+    """SSIM of every window of k against the reference statistics.
+
+    Variances and the covariance are formed from exact integer window sums as
+    ``(n * sum(xy) - sum(x) * sum(y)) / n**2``, which avoids cancellation.
+    """
+    size = reference["size"]
+    count = size * size
+    candidate = k.astype(np.int64)
+    sum_f = reference["sum"]
+    sum_k = box_sum(candidate, size)
+    var_f = (count * reference["square_sum"] - sum_f * sum_f) / count ** 2
+    var_k = (count * box_sum(candidate * candidate, size) - sum_k * sum_k) / count ** 2
+    covariance = (count * box_sum(reference["array"] * candidate, size) - sum_f * sum_k) / count ** 2
+    mean_f = sum_f / count
+    mean_k = sum_k / count
+    numerator = (2 * mean_f * mean_k + SSIM_C1) * (2 * covariance + SSIM_C2)
+    denominator = (mean_f * mean_f + mean_k * mean_k + SSIM_C1) * (var_f + var_k + SSIM_C2)
+    return numerator / denominator
@@ -1,68 +1,211 @@
-import random
+import numpy as np
 
-from .utils import copy_image, clamp_pixel
+from .arrays import as_array
+from .cache import cached
+from .image import as_image, returns_lists_for_lists
 
 
-def add_salt_and_pepper_noise(image, noise_level):
-    """Add both salt and pepper noise to an image."""
-    noisy = copy_image(image)
-    height = len(noisy)
-    width = len(noisy[0])
-    for y in range(height):
-        for x in range(width):
-            r = random.random()
-            if r < noise_level:
-                noisy[y][x] = 0
-            elif r > 1 - noise_level:
-                noisy[y][x] = 255
-    return noisy
+# Side of the square tiles that tiled noise is generated in. Part of the
+# definition of the noise: a different size gives a different image.
+NOISE_TILE_SIZE = 256
 
 
-def add_salt_noise(image, noise_level):
+def make_rng(rng=None):
+    """Return a NumPy Generator from None (fresh entropy), an int seed or a Generator."""
+    return np.random.default_rng(rng)
+
+
+def tile_rng(seed, tile_y, tile_x):
+    """Return the counter-based Generator for tile (tile_y, tile_x) of a seeded image.
+
+    Uses Philox keyed by the seed and the tile position, so each tile has its
+    own stream that does not depend on which other tiles were generated
+    before it, or on which process generates it.
+    """
+    return np.random.Generator(np.random.Philox(key=[seed, (tile_y << 32) | tile_x]))
+
+
+def _clamp(values):
+    """Truncate and clamp float pixel values to uint8 like utils.clamp_pixel."""
+    return as_image(np.clip(np.trunc(values), 0, 255).astype(np.uint8))
+
+
+@returns_lists_for_lists
+@cached("salt_and_pepper_noise")
+def add_salt_and_pepper_noise(image, noise_level, rng=None):
+    """Add both salt and pepper noise to an image.
+
+    Pass an int seed or ``numpy.random.Generator`` as ``rng`` for reproducible
+    output; the same seed always gives the same noisy image.
+    """
+    noisy = np.array(as_array(image))
+    r = make_rng(rng).random(noisy.shape)
+    # Pepper is written last so it wins where both ranges overlap (levels above 0.5)
+    noisy[r > 1 - noise_level] = 255
+    noisy[r < noise_level] = 0
+    return as_image(noisy)
+
+
+def add_sparse_salt_and_pepper_noise(image, noise_level, rng=None, in_place=False):
+    """Add salt and pepper noise by sampling only the pixels that get corrupted.
+
+    Follows the same per-pixel odds as ``add_salt_and_pepper_noise``: the number
+    of corrupted pixels is drawn from a binomial, their flat indices are
+    sampled without replacement and each becomes 0 or 255. Work scales with the
+    number of corrupted pixels; with ``in_place=True`` a uint8 array ``image``
+    is modified directly instead of copied. Returns ``(noisy, (ys, xs))`` with
+    the corrupted coordinates, ready for ``filters.adaptive_median_filter``.
+    """
+    rng = make_rng(rng)
+    if in_place and isinstance(image, np.ndarray) and image.dtype == np.uint8:
+        noisy = image
+    else:
+        noisy = np.array(as_array(image))
+    level = min(max(noise_level, 0.0), 1.0)
+    pepper_odds = level
+    salt_odds = 1.0 - max(level, 1.0 - level)
+    corrupt_odds = pepper_odds + salt_odds
+    count = int(rng.binomial(noisy.size, corrupt_odds)) if corrupt_odds > 0 else 0
+    flat = _sample_distinct(rng, noisy.size, count)
+    pepper = rng.random(count) < pepper_odds / corrupt_odds if count else np.zeros(0, dtype=bool)
+    ys, xs = np.unravel_index(flat, noisy.shape)
+    noisy[ys, xs] = np.where(pepper, 0, 255)
+    return as_image(noisy), (ys, xs)
+
+
+def _sample_distinct(rng, n, k):
+    """Return ``k`` distinct indices below ``n``.
+
+    Draws with replacement, drops the duplicates and draws again for the
+    shortfall, merging each smaller batch into the sorted result. That costs
+    O(k log k) instead of the O(n) permutation ``rng.choice(..., replace=False)``
+    makes once ``k`` is large. Above a fifth of ``n`` duplicates get common
+    enough that ``rng.choice`` is faster again, so it is used there.
+    """
+    if k > n // 5:
+        return rng.choice(n, size=k, replace=False)
+    flat = _sorted_unique(rng.integers(0, n, k))
+    while len(flat) < k:
+        extra = _sorted_unique(rng.integers(0, n, k - len(flat)))
+        positions = np.searchsorted(flat, extra)
+        new = flat[np.minimum(positions, len(flat) - 1)] != extra
+        flat = np.insert(flat, positions[new], extra[new])
+    return flat
+
+
+def _sorted_unique(values):
+    """Return the distinct values in increasing order (faster than np.unique here)."""
+    values = np.sort(values)
+    return values[np.r_[True, values[1:] != values[:-1]]] if len(values) else values
+
+
+def coupled_salt_and_pepper_noise(image, noise_levels, rng=None):
+    """Yield salt and pepper noise at increasing levels drawn from one uniform field.
+
+    Each pixel gets a single uniform draw ``r`` and at level L becomes pepper
+    where ``r < L`` and salt where ``r > 1 - L`` (pepper wins, as in
+    ``add_salt_and_pepper_noise``), so the corrupted pixels at a lower level
+    are a subset of those at a higher one. Levels are visited in increasing
+    order and only the pixels whose value changes are written between them.
+    Yields ``(level, noisy, (ys, xs))`` with the coordinates that changed
+    since the previous level.
+    """
+    noisy = np.array(as_array(image))
+    flat = noisy.reshape(-1)
+    r = make_rng(rng).random(flat.size)
+    order = np.argsort(r, kind="stable")
+    sorted_r = r[order]
+    pepper_count = 0
+    salt_start = flat.size
+    for level in sorted(noise_levels):
+        new_pepper_count = int(np.searchsorted(sorted_r, level, side="left"))
+        new_salt_start = int(np.searchsorted(sorted_r, 1 - level, side="right"))
+        salt = order[max(new_salt_start, new_pepper_count):salt_start]
+        pepper = order[pepper_count:new_pepper_count]
+        indices = np.concatenate([salt, pepper])
+        before = flat[indices]
+        flat[salt] = 255
+        flat[pepper] = 0
+        changed = indices[flat[indices] != before]
+        pepper_count = new_pepper_count
+        salt_start = min(salt_start, max(new_salt_start, new_pepper_count))
+        yield level, as_image(noisy.copy()), np.unravel_index(changed, noisy.shape)
+
+
+@returns_lists_for_lists
+@cached("salt_noise")
+def add_salt_noise(image, noise_level, rng=None):
     """Add only salt noise (white pixels)."""
-    noisy = copy_image(image)
-    height = len(noisy)
-    width = len(noisy[0])
-    for y in range(height):
-        for x in range(width):
-            if random.random() < noise_level:
-                noisy[y][x] = 255
-    return noisy
+    noisy = np.array(as_array(image))
+    noisy[make_rng(rng).random(noisy.shape) < noise_level] = 255
+    return as_image(noisy)
 
 
-def add_pepper_noise(image, noise_level):
+@returns_lists_for_lists
+@cached("pepper_noise")
+def add_pepper_noise(image, noise_level, rng=None):
     """Add only pepper noise (black pixels)."""
-    noisy = copy_image(image)
-    height = len(noisy)
-    width = len(noisy[0])
-    for y in range(height):
-        for x in range(width):
-            if random.random() < noise_level:
-                noisy[y][x] = 0
-    return noisy
+    noisy = np.array(as_array(image))
+    noisy[make_rng(rng).random(noisy.shape) < noise_level] = 0
+    return as_image(noisy)
 
 
-def add_gaussian_noise(image, mean, std_dev):
+@returns_lists_for_lists
+@cached("gaussian_noise")
+def add_gaussian_noise(image, mean, std_dev, rng=None):
     """Add Gaussian noise with given mean and standard deviation."""
-    noisy = copy_image(image)
-    height = len(noisy)
-    width = len(noisy[0])
-    for y in range(height):
-        for x in range(width):
-            noise = random.gauss(mean, std_dev)
-            noisy_value = noisy[y][x] + noise
-            noisy[y][x] = clamp_pixel(noisy_value)
-    return noisy
-
-
-def add_uniform_noise(image, min_value, max_value):
+    original = as_array(image)
+    return _clamp(original + make_rng(rng).normal(mean, std_dev, original.shape))
+
+
+@returns_lists_for_lists
+@cached("uniform_noise")
+def add_uniform_noise(image, min_value, max_value, rng=None):
     """Add uniform noise within a range."""
-    noisy = copy_image(image)
-    height = len(noisy)
-    width = len(noisy[0])
-    for y in range(height):
-        for x in range(width):
-            noise = random.uniform(min_value, max_value)
-            noisy_value = noisy[y][x] + noise
-            noisy[y][x] = clamp_pixel(noisy_value)
-    return noisy
+    original = as_array(image)
+    return _clamp(original + make_rng(rng).uniform(min_value, max_value, original.shape))
+
+
+NOISE_KINDS = {
+    "salt_and_pepper": add_salt_and_pepper_noise,
+    "salt": add_salt_noise,
+    "pepper": add_pepper_noise,
+    "gaussian": add_gaussian_noise,
+    "uniform": add_uniform_noise,
+}
+
+
+def noise_tiles(shape, tile_size=NOISE_TILE_SIZE):
+    """Return (tile_y, tile_x, y0, y1, x0, x1) for every tile of an image shape."""
+    height, width = shape
+    return [
+        (y0 // tile_size, x0 // tile_size, y0, min(height, y0 + tile_size), x0, min(width, x0 + tile_size))
+        for y0 in range(0, height, tile_size)
+        for x0 in range(0, width, tile_size)
+    ]
+
+
+def add_noise_tile(tile, kind, seed, tile_y, tile_x, *params):
+    """Add ``kind`` noise to one tile using that tile's own RNG stream.
+
+    ``kind`` is a key of ``NOISE_KINDS`` and ``params`` are that generator's
+    arguments after the image. The same tile pixels, seed and position
+    always give the same output, so tiles can be made in any order.
+    """
+    return NOISE_KINDS[kind](tile, *params, rng=tile_rng(seed, tile_y, tile_x))
+
+
+@returns_lists_for_lists
+@cached("tiled_noise")
+def add_tiled_noise(image, kind, *params, seed, tile_size=NOISE_TILE_SIZE):
+    """Add reproducible ``kind`` noise to a whole image, one tile at a time.
+
+    The result is what ``add_noise_tile`` gives for each tile, so it can be
+    split across processes (``parallel.parallel_noise``) or regenerated for a
+    single region without drawing the rest of the image.
+    """
+    original = as_array(image)
+    noisy = np.empty_like(original)
+    for tile_y, tile_x, y0, y1, x0, x1 in noise_tiles(original.shape, tile_size):
+        noisy[y0:y1, x0:x1] = add_noise_tile(original[y0:y1, x0:x1], kind, seed, tile_y, tile_x, *params)
+    return as_image(noisy)
@@ -0,0 +1,100 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from .arrays import as_array, from_array
+from .borders import pad_array
+from .filters import filter_padded
+from .noise import NOISE_TILE_SIZE, add_noise_tile, noise_tiles
+
+# Bands scheduled per worker, so faster workers can pick up more of them.
+BANDS_PER_WORKER = 4
+
+# Shared-memory views attached once per worker process.
+_worker_arrays = {}
+
+
+def parallel_filter(image, kind, window, *params, workers=None, band_rows=None, border="replicate"):
+    """Filter an image on several processes and return the same pixels as the serial path.
+
+    ``kind`` is one of ``filters.FILTER_KINDS`` and ``params`` are the filter's
+    extra arguments (trim amount or Q). The padded input and the output
+    live in shared memory; each worker filters a band of output rows from the
+    input band plus a halo of ``window // 2`` rows and writes its rows straight
+    into the output buffer, so no image is pickled between processes.
+    ``border`` is one of ``borders.BORDER_MODES``.
+    """
+    array = as_array(image)
+    height, width = array.shape
+    offset = window // 2
+    workers = workers or os.cpu_count() or 1
+    if band_rows is None:
+        band_rows = math.ceil(height / (workers * BANDS_PER_WORKER))
+    band_rows = max(1, band_rows)
+    padded_shape = (height + 2 * offset, width + 2 * offset)
+
+    source_memory = SharedMemory(create=True, size=max(1, math.prod(padded_shape)))
+    result_memory = SharedMemory(create=True, size=max(1, height * width))
+    try:
+        padded = np.ndarray(padded_shape, dtype=np.uint8, buffer=source_memory.buf)
+        padded[:] = pad_array(array, offset, border)
+        result = np.ndarray((height, width), dtype=np.uint8, buffer=result_memory.buf)
+        bands = [(y0, min(height, y0 + band_rows)) for y0 in range(0, height, band_rows)]
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(bands)),
+            initializer=_attach,
+            initargs=(source_memory.name, padded_shape, result_memory.name, (height, width)),
+        ) as executor:
+            jobs = [
+                executor.submit(_filter_band, y0, y1, kind, window, params)
+                for y0, y1 in bands
+            ]
+            for job in jobs:
+                job.result()
+        # Copy out of the shared buffer, which is unmapped and unlinked below
+        filtered = from_array(result.copy())
+        del padded, result
+    finally:
+        source_memory.close()
+        source_memory.unlink()
+        result_memory.close()
+        result_memory.unlink()
+    return filtered
+
+
+def _attach(source_name, source_shape, result_name, result_shape):
+    """Map the shared input and output buffers into this worker."""
+    source_memory = SharedMemory(name=source_name)
+    result_memory = SharedMemory(name=result_name)
+    _worker_arrays["memory"] = (source_memory, result_memory)
+    _worker_arrays["source"] = np.ndarray(source_shape, dtype=np.uint8, buffer=source_memory.buf)
+    _worker_arrays["result"] = np.ndarray(result_shape, dtype=np.uint8, buffer=result_memory.buf)
+
+
+def _filter_band(y0, y1, kind, window, params):
+    """Filter output rows y0..y1 from their halo-extended input band."""
+    halo = 2 * (window // 2)
+    band = _worker_arrays["source"][y0:y1 + halo]
+    _worker_arrays["result"][y0:y1] = filter_padded(band, kind, window, *params)
+
+
+def parallel_noise(image, kind, *params, seed, workers=None, tile_size=NOISE_TILE_SIZE):
+    """Add tiled noise on several processes; equal to ``noise.add_tiled_noise``.
+
+    Every tile is drawn from its own counter-based stream, so the result does
+    not depend on the number of workers or the order tiles finish in.
+    """
+    original = as_array(image)
+    noisy = np.empty_like(original)
+    tiles = noise_tiles(original.shape, tile_size)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = [
+            executor.submit(add_noise_tile, original[y0:y1, x0:x1], kind, seed, tile_y, tile_x, *params)
+            for tile_y, tile_x, y0, y1, x0, x1 in tiles
+        ]
+        for (_, _, y0, y1, x0, x1), job in zip(tiles, jobs):
+            noisy[y0:y1, x0:x1] = job.result()
+    return from_array(noisy)
@@ -0,0 +1,202 @@
+import csv
+import json
+import sqlite3
+import time
+
+# Columns identifying a cell, in the order cell_key and the schema use.
+CELL_FIELDS = ("image", "noise", "level", "filter", "window", "params", "seed")
+# Pixel-count metrics, read back as ints.
+COUNT_METRICS = ("noisy", "fixed", "unfixed", "damaged", "untouched")
+# Metric columns written by the experiment scripts, in export order.
+METRIC_NAMES = COUNT_METRICS + ("mse", "psnr", "ssim")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cells (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    image TEXT NOT NULL,
+    noise TEXT NOT NULL,
+    level REAL NOT NULL,
+    filter TEXT NOT NULL,
+    window INTEGER NOT NULL,
+    params TEXT NOT NULL,
+    seed INTEGER
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    cell_id INTEGER NOT NULL REFERENCES cells(id),
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (cell_id, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cells_noise_level ON cells(noise, level);
+CREATE INDEX IF NOT EXISTS cells_filter ON cells(filter, window, noise);
+CREATE INDEX IF NOT EXISTS cells_run ON cells(run_id);
+CREATE INDEX IF NOT EXISTS cells_identity ON cells(image, noise, level, filter, window, params, seed);
+"""
+
+# Keeps only the newest row of each distinct cell (same image, noise, filter, ...).
+LATEST_CELL = (
+    "c.id = (SELECT MAX(l.id) FROM cells l WHERE l.image = c.image AND l.noise = c.noise"
+    " AND l.level = c.level AND l.filter = c.filter AND l.window = c.window"
+    " AND l.params = c.params AND l.seed IS c.seed)"
+)
+
+
+def open_store(path):
+    """Open (creating if needed) a results database and return the connection.
+
+    The database uses write-ahead logging and waits for locks, so several
+    processes can insert into it and read it at the same time.
+    """
+    connection = sqlite3.connect(path, timeout=60)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def start_run(connection, name):
+    """Record a new run (one script or grid invocation) and return its id."""
+    with connection:
+        cursor = connection.execute("INSERT INTO runs (name, created) VALUES (?, ?)", (name, time.time()))
+    return cursor.lastrowid
+
+
+def insert_rows(connection, run_id, rows):
+    """Insert result rows for a run in one transaction.
+
+    Each row is a dict with the CELL_FIELDS (``params`` a list, ``seed`` an
+    int or None) plus any numeric metrics, e.g. the counts from
+    ``metrics.confusion_table`` and the scores from ``metrics.quality_scores``.
+    """
+    with connection:
+        for row in rows:
+            cursor = connection.execute(
+                "INSERT INTO cells (run_id, image, noise, level, filter, window, params, seed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, row["image"], row["noise"], row["level"], row["filter"], row["window"],
+                 json.dumps(list(row["params"])), row.get("seed")),
+            )
+            connection.executemany(
+                "INSERT INTO metrics (cell_id, name, value) VALUES (?, ?, ?)",
+                [(cursor.lastrowid, name, value) for name, value in row.items() if name not in CELL_FIELDS],
+            )
+
+
+def cell_key(row):
+    """Return a string identifying a cell by its CELL_FIELDS."""
+    key = dict(row, level=float(row["level"]), params=list(row["params"]))
+    return json.dumps([key[name] for name in CELL_FIELDS])
+
+
+def completed_keys(connection):
+    """Return the cell_key of every cell recorded in any run."""
+    query = "SELECT DISTINCT image, noise, level, filter, window, params, seed FROM cells"
+    return {
+        cell_key(dict(row, params=json.loads(row["params"])))
+        for row in connection.execute(query)
+    }
+
+
+def query_cells(connection, noise=None, level=None, filter=None, window=None, run_id=None, latest=False):
+    """Return result rows as dicts with the cell fields and every metric, filtered by the arguments.
+
+    Filters left as None match everything. With ``latest=True`` only the most
+    recent run's row is kept for each distinct cell. Rows are ordered by
+    noise, filter, window, params and level.
+    """
+    conditions = []
+    values = []
+    for column, value in (("noise", noise), ("level", level), ("filter", filter), ("window", window), ("run_id", run_id)):
+        if value is not None:
+            conditions.append(f"c.{column} = ?")
+            values.append(value)
+    if latest:
+        conditions.append(LATEST_CELL)
+    pivot = ", ".join(f"MAX(CASE WHEN m.name = '{name}' THEN m.value END) AS {name}" for name in METRIC_NAMES)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = (
+        f"SELECT c.id, c.run_id, c.image, c.noise, c.level, c.filter, c.window, c.params, c.seed, {pivot}"
+        f" FROM cells c LEFT JOIN metrics m ON m.cell_id = c.id {where}"
+        " GROUP BY c.id ORDER BY c.noise, c.filter, c.window, c.params, c.level, c.id"
+    )
+    rows = []
+    for row in connection.execute(query, values):
+        row = dict(row)
+        row["params"] = json.loads(row["params"])
+        for name in COUNT_METRICS:
+            if row[name] is not None:
+                row[name] = int(row[name])
+        rows.append(row)
+    return rows
+
+
+def filter_label(row):
+    """Name a row's filter like the experiment tables do, e.g. ``trimmed_alpha_3_1``."""
+    return "_".join([row["filter"], str(row["window"])] + [str(param) for param in row["params"]])
+
+
+def export_csv(connection, path, **conditions):
+    """Write the rows matching ``query_cells(**conditions)`` to a CSV file."""
+    rows = query_cells(connection, **conditions)
+    with open(path, "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["run_id", *CELL_FIELDS, *METRIC_NAMES])
+        for row in rows:
+            writer.writerow(
+                [row["run_id"]]
+                + [json.dumps(row["params"]) if name == "params" else row[name] for name in CELL_FIELDS]
+                + ["" if row[name] is None else row[name] for name in METRIC_NAMES]
+            )
+    return len(rows)
+
+
+def noise_levels(connection, noise):
+    """Return the distinct levels recorded for a noise type, lowest first."""
+    query = "SELECT DISTINCT level FROM cells WHERE noise = ? ORDER BY level"
+    return [row[0] for row in connection.execute(query, (noise,))]
+
+
+def level_series(connection, noise, filter, window, params=()):
+    """Return (level, noisy, fixed, damaged) per noise level for one filter, averaged over cells.
+
+    Only the latest run of each cell counts.
+    """
+    return _averaged(
+        connection, "c.level", "c.noise = ? AND c.filter = ? AND c.window = ? AND c.params = ?",
+        [noise, filter, window, json.dumps(list(params))],
+    )
+
+
+def filter_comparison(connection, noise, level):
+    """Return (filter label, noisy, fixed, damaged) per filter for one noise type and level.
+
+    Counts are averaged over images and only the latest run of each cell counts.
+    """
+    rows = _averaged(
+        connection, "c.filter, c.window, c.params", "c.noise = ? AND c.level = ?", [noise, level],
+    )
+    return [
+        (filter_label({"filter": kind, "window": window, "params": json.loads(params)}), *counts)
+        for kind, window, params, *counts in rows
+    ]
+
+
+def _averaged(connection, group, condition, values):
+    """Average noisy, fixed and damaged over the latest cells matching ``condition``, grouped by ``group``."""
+    query = f"""
+        SELECT {group},
+            AVG(CASE WHEN m.name = 'noisy' THEN m.value END),
+            AVG(CASE WHEN m.name = 'fixed' THEN m.value END),
+            AVG(CASE WHEN m.name = 'damaged' THEN m.value END)
+        FROM cells c JOIN metrics m ON m.cell_id = c.id
+        WHERE {condition} AND {LATEST_CELL}
+        GROUP BY {group} ORDER BY {group}
+    """
+    return [tuple(row) for row in connection.execute(query, values)]
@@ -0,0 +1,172 @@
+import collections
+import inspect
+import itertools
+import os
+import struct
+
+import numpy as np
+
+from .borders import border_index, border_indices
+from .filters import filter_padded
+from .image_io import open_image
+from .metrics import add_confusion
+from .noise import make_rng
+
+# Output rows produced per filter call while streaming.
+STREAM_CHUNK_ROWS = 8
+# Rows decoded per step when streaming from an image file.
+READ_BAND_ROWS = 256
+# Fixed size of the .npy header written by write_rows, rewritten once the height is known.
+NPY_HEADER_BYTES = 128
+
+
+def read_rows(source, band_rows=READ_BAND_ROWS):
+    """Yield the rows of an image one at a time as uint8 arrays.
+
+    ``source`` is a 2D array (including a memory-mapped store), a ``.npy`` path,
+    which is memory-mapped, or an image file path. Pillow cannot decode part
+    of a frame, so a file is decoded whole (plus a grayscale copy unless it
+    is already 8-bit gray) before its rows are handed out in bands; memory
+    stays bounded only for arrays and ``.npy`` stores. Convert large files
+    once with ``image_store.convert_to_store`` and stream the store.
+    """
+    if isinstance(source, (str, os.PathLike)) and os.fspath(source).lower().endswith(".npy"):
+        source = np.load(source, mmap_mode="r")
+    if isinstance(source, (str, os.PathLike)):
+        with open_image(source) as image:
+            gray = image if image.mode == "L" else image.convert("L")
+            width, height = gray.size
+            for y0 in range(0, height, band_rows):
+                y1 = min(height, y0 + band_rows)
+                band = np.frombuffer(gray.crop((0, y0, width, y1)).tobytes(), dtype=np.uint8)
+                yield from band.reshape(y1 - y0, width)
+        return
+    for row in source:
+        yield np.asarray(row, dtype=np.uint8)
+
+
+def map_rows(rows, image_fn, *args, **kwargs):
+    """Apply a per-pixel image function (such as a noise generator) row by row.
+
+    If ``image_fn`` takes an ``rng``, it is turned into one Generator shared by
+    every row, so an int seed seeds the whole stream once instead of
+    restarting on each row. For the noise generators in ``noise`` a seeded
+    stream then draws the same pixels as one call on the whole image.
+    """
+    signature = inspect.signature(image_fn)
+    bound = signature.bind(None, *args, **kwargs)
+    if "rng" in signature.parameters:
+        bound.arguments["rng"] = make_rng(bound.arguments.get("rng"))
+    args, kwargs = bound.args[1:], bound.kwargs
+    for row in rows:
+        yield np.asarray(image_fn(np.asarray(row)[None, :], *args, **kwargs), dtype=np.uint8)[0]
+
+
+def stream_filter(rows, kind, window, *params, border="replicate", chunk_rows=STREAM_CHUNK_ROWS):
+    """Filter a stream of rows, yielding filtered rows as soon as they are known.
+
+    Only ``window - 1 + chunk_rows`` padded rows are held at any time, so memory
+    is O(width x window) whatever the image height. ``kind`` and ``params`` are
+    as in ``filters.filter_padded``; the output matches filtering the whole
+    image. ``"wrap"`` borders need the last rows before the first can be
+    filtered and are not supported.
+    """
+    if border == "wrap":
+        raise ValueError("Streaming filters do not support wrap borders.")
+    size = 2 * (window // 2) + 1
+    buffer = collections.deque()
+    for padded_row in _vertically_padded(rows, window // 2, border):
+        buffer.append(padded_row)
+        if len(buffer) == size - 1 + chunk_rows:
+            yield from filter_padded(np.stack(buffer), kind, window, *params)
+            for _ in range(chunk_rows):
+                buffer.popleft()
+    if len(buffer) >= size:
+        yield from filter_padded(np.stack(buffer), kind, window, *params)
+
+
+def _vertically_padded(rows, offset, border):
+    """Yield horizontally padded rows with ``offset`` border rows above and below."""
+    columns = None
+    recent = collections.deque(maxlen=offset + 1)
+    height = 0
+    for row in rows:
+        row = np.asarray(row, dtype=np.uint8)
+        if columns is None:
+            columns = border_indices(-offset, len(row) + offset, len(row), border)
+        padded = row[np.clip(columns, 0, None)]
+        padded[columns < 0] = 0
+        recent.append(padded)
+        height += 1
+        if height == offset + 1:
+            # Any height above offset maps the top border rows the same way
+            yield from _border_rows(recent, range(-offset, 0), offset + 1, border, 0)
+            yield from recent
+        elif height > offset + 1:
+            yield padded
+    if height == 0:
+        return
+    if height <= offset:
+        yield from _border_rows(recent, range(-offset, height + offset), height, border, 0)
+        return
+    yield from _border_rows(recent, range(height, height + offset), height, border, height - len(recent))
+
+
+def _border_rows(recent, positions, height, border, first):
+    """Yield the rows at ``positions`` of an image of ``height`` rows.
+
+    ``recent`` holds the rows starting at index ``first``; rows outside the image
+    come from ``borders.border_index``, or are zero in constant mode.
+    """
+    for y in positions:
+        source = border_index(y, height, border)
+        if source is None:
+            yield np.zeros_like(recent[0])
+        else:
+            yield recent[source - first]
+
+
+def score_rows(f_rows, g_rows, k_rows, counts, tile_size=None):
+    """Yield the rows of k unchanged while adding their outcome counts to ``counts``.
+
+    ``counts`` gains ``noisy``, ``fixed``, ``unfixed``, ``damaged`` and
+    ``untouched`` totals as in ``metrics.confusion_table``, and per-tile
+    ``tiles`` when ``tile_size`` is set; memory grows with the tile grid only.
+    """
+    for key in ("noisy", "fixed", "unfixed", "damaged", "untouched"):
+        counts.setdefault(key, 0)
+    for y, (f_row, g_row, k_row) in enumerate(zip(f_rows, g_rows, k_rows)):
+        add_confusion(counts, f_row, g_row, k_row, y, tile_size)
+        yield k_row
+
+
+def write_rows(rows, path):
+    """Stream rows into an ``.npy`` image store and return its (height, width).
+
+    The header is rewritten with the final height once the stream ends, so the
+    height does not need to be known in advance.
+    """
+    height = 0
+    width = 0
+    with open(path, "wb") as handle:
+        handle.write(_npy_header(0, 0))
+        for row in rows:
+            row = np.ascontiguousarray(row, dtype=np.uint8)
+            width = len(row)
+            handle.write(row.tobytes())
+            height += 1
+        handle.seek(0)
+        handle.write(_npy_header(height, width))
+    return height, width
+
+
+def _npy_header(height, width):
+    """Return a version 1.0 .npy header of NPY_HEADER_BYTES for a uint8 image."""
+    header = "{'descr': '|u1', 'fortran_order': False, 'shape': (%d, %d), }" % (height, width)
+    header = header.ljust(NPY_HEADER_BYTES - 11) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+def tee_rows(rows, count=2):
+    """Split a row stream for several consumers; only rows not yet read by all are kept."""
+    return itertools.tee(rows, count)
@@ -0,0 +1,83 @@
+import numpy as np
+
+from .arrays import from_array
+from .borders import border_indices, pad_array
+from .filters import filter_padded, filter_points
+from .integral import box_sum
+from .noise import coupled_salt_and_pepper_noise
+
+# Above this fraction of dirty output pixels the whole image is filtered again,
+# since the full vectorized path is cheaper per pixel than point filtering.
+FULL_REFILTER_FRACTION = 0.25
+
+
+def coupled_filter_sweep(image, noise_levels, kind, window, *params, rng=None, border="replicate"):
+    """Filter nested salt and pepper noise at increasing levels, reusing earlier work.
+
+    The noise comes from ``noise.coupled_salt_and_pepper_noise``, so every
+    level only adds corrupted pixels to the previous one. The first level is
+    filtered in full; after that only output pixels whose window covers a
+    newly changed pixel are recomputed, and every result equals filtering that
+    level's noisy image from scratch. ``kind`` and ``params`` are as in
+    ``filters.filter_bank``. Yields ``(level, noisy, filtered)``.
+    """
+    offset = window // 2
+    padded = None
+    filtered = None
+    for level, noisy, (ys, xs) in coupled_salt_and_pepper_noise(image, noise_levels, rng):
+        if padded is None:
+            padded = pad_array(noisy.view(np.ndarray), offset, border)
+            filtered = filter_padded(padded, kind, window, *params)
+            yield level, noisy, from_array(filtered.copy())
+            continue
+        padded[ys + offset, xs + offset] = noisy[ys, xs]
+        _refresh_border(padded, offset, border)
+        dirty_ys, dirty_xs = _dirty_outputs(noisy.shape, ys, xs, offset, border)
+        if len(dirty_ys) > FULL_REFILTER_FRACTION * noisy.size:
+            filtered = filter_padded(padded, kind, window, *params)
+        elif len(dirty_ys):
+            filtered[dirty_ys, dirty_xs] = filter_points(padded, kind, window, dirty_ys, dirty_xs, *params)
+        yield level, noisy, from_array(filtered.copy())
+
+
+def _refresh_border(padded, offset, border):
+    """Copy the interior of a padded array back out into its border strips."""
+    if offset == 0 or border == "constant":
+        return
+    height = padded.shape[0] - 2 * offset
+    width = padded.shape[1] - 2 * offset
+    rows = border_indices(-offset, height + offset, height, border) + offset
+    columns = border_indices(-offset, width + offset, width, border) + offset
+    edge_rows = np.r_[0:offset, height + offset:height + 2 * offset]
+    edge_columns = np.r_[0:offset, width + offset:width + 2 * offset]
+    padded[edge_rows] = padded[rows[edge_rows]]
+    padded[:, edge_columns] = padded[:, columns[edge_columns]]
+
+
+def _dirty_outputs(shape, ys, xs, offset, border):
+    """Return the output pixels whose window, border included, covers a changed pixel.
+
+    Border copies of a pixel stay within ``offset`` of it (modulo the size
+    for ``"wrap"``), so dilating the changed coordinates is enough unless the
+    window is larger than the image, where a padded mask is used instead.
+    Points come back in row-major order, which keeps later gathers local.
+    """
+    height, width = shape
+    if offset >= min(height, width):
+        size = 2 * offset + 1
+        changed = np.zeros(shape, dtype=np.uint8)
+        changed[ys, xs] = 1
+        return np.nonzero(box_sum(pad_array(changed, offset, border), size) > 0)
+    steps = np.arange(-offset, offset + 1)
+    dirty_ys = (ys[:, None, None] + steps[None, :, None]).repeat(len(steps), axis=2).ravel()
+    dirty_xs = (xs[:, None, None] + steps[None, None, :]).repeat(len(steps), axis=1).ravel()
+    if border == "wrap":
+        dirty_ys %= height
+        dirty_xs %= width
+    else:
+        inside = (dirty_ys >= 0) & (dirty_ys < height) & (dirty_xs >= 0) & (dirty_xs < width)
+        dirty_ys = dirty_ys[inside]
+        dirty_xs = dirty_xs[inside]
+    dirty = np.zeros(height * width, dtype=bool)
+    dirty[dirty_ys * width + dirty_xs] = True
+    return np.divmod(np.flatnonzero(dirty), width)
@@ -1,5 +1,10 @@
+import numpy as np
+
+
 def copy_image(image):
-    """Deep copy a 2D list of pixel values."""
+    """Deep copy a GrayImage or a 2D list of pixel values."""
+    if isinstance(image, np.ndarray):
+        return image.copy()
     new_image = []
     for row in image:
         new_row = []
@@ -1,8 +1,16 @@
 import csv
 import os
+import sys
 
 import matplotlib.pyplot as plt
 
+current_dir = os.path.dirname(__file__)
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from common import results_store
+
 
 def read_csv(path):
     rows = []
@@ -13,18 +21,7 @@ def read_csv(path):
     return rows
 
 
-def plot_noise_levels(header, data, title):
-    noise_levels = []
-    noisy_pixels = []
-    fixed_pixels = []
-    damaged_pixels = []
-
-    for row in data:
-        noise_levels.append(float(row[0]))
-        noisy_pixels.append(int(row[1]))
-        fixed_pixels.append(int(row[2]))
-        damaged_pixels.append(int(row[3]))
-
+def plot_noise_levels(noise_levels, noisy_pixels, fixed_pixels, damaged_pixels, title):
     plt.figure()
     plt.plot(noise_levels, noisy_pixels, label="Noisy pixels")
     plt.plot(noise_levels, fixed_pixels, label="Fixed noisy pixels")
@@ -38,16 +35,7 @@ def plot_noise_levels(header, data, title):
     plt.show()
 
 
-def plot_filters(header, data, title):
-    filters = []
-    fixed_pixels = []
-    damaged_pixels = []
-
-    for row in data:
-        filters.append(row[0])
-        fixed_pixels.append(int(row[2]))
-        damaged_pixels.append(int(row[3]))
-
+def plot_filters(filters, fixed_pixels, damaged_pixels, title):
     positions = list(range(len(filters)))
     width = 0.35
 
@@ -62,12 +50,7 @@ def plot_filters(header, data, title):
     plt.show()
 
 
-def main():
-    csv_path = input("Enter path to CSV file: ").strip()
-    if not os.path.exists(csv_path):
-        print("CSV file not found.")
-        return
-
+def plot_csv(csv_path):
     rows = read_csv(csv_path)
     if len(rows) < 2:
         print("CSV file is empty.")
@@ -77,12 +60,56 @@ def main():
     data = rows[1:]
 
     if "noise_level" in header:
-        plot_noise_levels(header, data, "Noise Levels Experiment")
+        plot_noise_levels(
+            [float(row[0]) for row in data],
+            [int(row[1]) for row in data],
+            [int(row[2]) for row in data],
+            [int(row[3]) for row in data],
+            "Noise Levels Experiment",
+        )
     elif "filter" in header:
-        plot_filters(header, data, "Filter Comparison")
+        plot_filters([row[0] for row in data], [int(row[2]) for row in data], [int(row[3]) for row in data], "Filter Comparison")
     else:
         print("Unknown table format. Unable to plot.")
 
 
+def plot_store(store_path):
+    store = results_store.open_store(store_path)
+    noise = input("Noise type [salt_and_pepper]: ").strip() or "salt_and_pepper"
+    levels = results_store.noise_levels(store, noise)
+    if not levels:
+        print(f"No results for {noise}.")
+        store.close()
+        return
+
+    series = results_store.level_series(store, noise, "median", 3)
+    if len(series) > 1:
+        level_values, noisy, fixed, damaged = zip(*series)
+        plot_noise_levels(level_values, noisy, fixed, damaged, f"Noise Levels Experiment ({noise}, median_3)")
+
+    choice = input(f"Level to compare filters at {levels} [{levels[-1]}]: ").strip()
+    level = float(choice) if choice else levels[-1]
+    comparison = results_store.filter_comparison(store, noise, level)
+    store.close()
+    if not comparison:
+        print(f"No results for {noise} at level {level}.")
+        return
+    labels, _, fixed, damaged = zip(*comparison)
+    plot_filters(labels, fixed, damaged, f"Filter Comparison ({noise}, level {level})")
+
+
+def main():
+    default_store = os.path.join(os.path.dirname(__file__), "results", "results.db")
+    path = input(f"Enter path to CSV file or results database [{default_store}]: ").strip() or default_store
+    if not os.path.exists(path):
+        print("File not found.")
+        return
+
+    if path.endswith(".db"):
+        plot_store(path)
+    else:
+        plot_csv(path)
+
+
 if __name__ == "__main__":
     main()
@@ -1,5 +1,13 @@
 import csv
 import os
+import sys
+
+current_dir = os.path.dirname(__file__)
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from common import results_store
 
 
 def read_csv(path):
@@ -11,6 +19,32 @@ def read_csv(path):
     return rows
 
 
+def write_store_summary(summary_file, store):
+    """Write one table per noise type from the latest result of every cell."""
+    rows = results_store.query_cells(store, latest=True)
+    current_noise = None
+    for row in rows:
+        if row["noise"] != current_noise:
+            if current_noise is not None:
+                summary_file.write("\n")
+            current_noise = row["noise"]
+            summary_file.write(f"Noise: {current_noise}\n")
+            summary_file.write("image, level, filter, noisy_pixels, fixed_pixels, damaged_clean_pixels, mse, psnr, ssim\n")
+        values = [row["image"], row["level"], results_store.filter_label(row)]
+        for name in ("noisy", "fixed", "damaged", "mse", "psnr", "ssim"):
+            if row[name] is None:
+                values.append("")
+            elif name in results_store.COUNT_METRICS:
+                # Counts stay exact; :g would round 1234567 to 1.23457e+06
+                values.append(str(int(row[name])))
+            else:
+                values.append(f"{row[name]:g}")
+        summary_file.write(", ".join(str(value) for value in values) + "\n")
+    if current_noise is not None:
+        summary_file.write("\n")
+    return len(rows)
+
+
 def main():
     results_dir = os.path.join(os.path.dirname(__file__), "results")
     if not os.path.exists(results_dir):
@@ -18,6 +52,18 @@ def main():
         return
 
     summary_path = os.path.join(results_dir, "summary.txt")
+    store_path = os.path.join(results_dir, "results.db")
+    if os.path.exists(store_path):
+        store = results_store.open_store(store_path)
+        with open(summary_path, "w") as summary_file:
+            count = write_store_summary(summary_file, store)
+        export_path = os.path.join(results_dir, "results_export.csv")
+        results_store.export_csv(store, export_path, latest=True)
+        store.close()
+        print(f"Summary of {count} results written to {summary_path}; CSV export in {export_path}")
+        return
+
+    # Older results directories only have the per-experiment CSV tables
     with open(summary_path, "w") as summary_file:
         for filename in os.listdir(results_dir):
             if not filename.endswith(".csv"):
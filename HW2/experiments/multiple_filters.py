@@ -7,7 +7,8 @@ parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
-from common import filters, image_io, metrics, noise
+from common import filters, image_io, metrics, noise, results_store
+from common.artifacts import ArtifactWriter
 
 
 def ensure_results_dir():
@@ -19,30 +20,27 @@ def ensure_results_dir():
 
 def apply_filters(original, noisy):
     """Apply several filters and return metric rows."""
-    rows = []
-
-    # Median filter with window 3
-    median_result = filters.median_filter(noisy, 3)
-    rows.append(("median_3", median_result))
-
-    # Mean filter with window 3
-    mean_result = filters.mean_filter(noisy, 3)
-    rows.append(("mean_3", mean_result))
-
-    # Trimmed alpha filter: window 3, trim 1 pixel from each side
-    trimmed_result = filters.trimmed_alpha_filter(noisy, 3, 1)
-    rows.append(("trimmed_alpha_3_trim1", trimmed_result))
+    names = ["median_3", "mean_3", "trimmed_alpha_3_trim1", "contra_harmonic_Q1"]
+    specs = [
+        ("median", 3),
+        ("mean", 3),
+        # Trimmed alpha filter: window 3, trim 1 pixel from each side
+        ("trimmed_alpha", 3, 1),
+        # Contra-harmonic filter with Q=1
+        ("contra_harmonic", 3, 1),
+    ]
+    # One traversal gathers and sorts each 3x3 window once for all filters
+    rows = list(zip(names, specs, filters.filter_bank(noisy, specs)))
 
-    # Contra-harmonic filter with Q=1
-    contra_result = filters.contra_harmonic_filter(noisy, 3, 1)
-    rows.append(("contra_harmonic_Q1", contra_result))
+    # Exact-match counts say little about Gaussian and uniform noise, so every
+    # output is also scored by MSE, PSNR and SSIM against the clean image
+    quality = metrics.quality_scores(original, [filtered for _, _, filtered in rows])
 
     results = []
-    for name, filtered in rows:
-        noisy_pixels = metrics.count_noisy_pixels(original, noisy)
-        fixed = metrics.count_fixed_noisy_pixels(original, noisy, filtered)
-        damaged = metrics.count_damaged_clean_pixels(original, noisy, filtered)
-        results.append((name, noisy_pixels, fixed, damaged, filtered))
+    for (name, spec, filtered), scores in zip(rows, quality):
+        # One pass over the three images gives every count
+        table = metrics.confusion_table(original, noisy, filtered)
+        results.append((name, spec, table, scores, filtered))
     return results
 
 
@@ -50,33 +48,48 @@ def main():
     image_path = input("Enter path to original clean image: ").strip()
     original = image_io.load_grayscale_image(image_path)
     results_dir = ensure_results_dir()
+    store = results_store.open_store(os.path.join(results_dir, "results.db"))
+    run_id = results_store.start_run(store, "multiple_filters")
 
+    # Levels are the noise level, Gaussian standard deviation or uniform half range
     noise_types = [
-        ("salt_and_pepper", lambda img: noise.add_salt_and_pepper_noise(img, 0.05)),
-        ("salt", lambda img: noise.add_salt_noise(img, 0.05)),
-        ("pepper", lambda img: noise.add_pepper_noise(img, 0.05)),
-        ("gaussian", lambda img: noise.add_gaussian_noise(img, 0, 10)),
-        ("uniform", lambda img: noise.add_uniform_noise(img, -10, 10)),
+        ("salt_and_pepper", 0.05, lambda img: noise.add_salt_and_pepper_noise(img, 0.05)),
+        ("salt", 0.05, lambda img: noise.add_salt_noise(img, 0.05)),
+        ("pepper", 0.05, lambda img: noise.add_pepper_noise(img, 0.05)),
+        ("gaussian", 10, lambda img: noise.add_gaussian_noise(img, 0, 10)),
+        ("uniform", 10, lambda img: noise.add_uniform_noise(img, -10, 10)),
     ]
 
-    for noise_name, noise_fn in noise_types:
-        noisy = noise_fn(original)
-        filtered_results = apply_filters(original, noisy)
-
-        table_path = os.path.join(results_dir, f"filters_{noise_name}.csv")
-        with open(table_path, "w", newline="") as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(["filter", "noisy_pixels", "fixed_pixels", "damaged_clean_pixels"])
-            for name, noisy_pixels, fixed, damaged, filtered in filtered_results:
-                writer.writerow([name, noisy_pixels, fixed, damaged])
-
-                noisy_path = os.path.join(results_dir, f"{noise_name}_noisy.png")
-                filtered_path = os.path.join(results_dir, f"{noise_name}_{name}.png")
-                image_io.save_grayscale_image(noisy, noisy_path)
-                image_io.save_grayscale_image(filtered, filtered_path)
-
-        print(f"Saved table for {noise_name} to {table_path}")
-
+    # PNG encoding happens on background threads while the next noise type is filtered
+    with ArtifactWriter() as writer:
+        for noise_name, level, noise_fn in noise_types:
+            noisy = noise_fn(original)
+            filtered_results = apply_filters(original, noisy)
+            writer.write(noisy, os.path.join(results_dir, f"{noise_name}_noisy.png"))
+            results_store.insert_rows(store, run_id, [
+                dict(
+                    {name: table[name] for name in ("noisy", "fixed", "unfixed", "damaged", "untouched")},
+                    image=image_path, noise=noise_name, level=level,
+                    filter=spec[0], window=spec[1], params=list(spec[2:]), seed=None, **scores,
+                )
+                for _, spec, table, scores, _ in filtered_results
+            ])
+
+            table_path = os.path.join(results_dir, f"filters_{noise_name}.csv")
+            with open(table_path, "w", newline="") as csvfile:
+                csv_writer = csv.writer(csvfile)
+                csv_writer.writerow(["filter", "noisy_pixels", "fixed_pixels", "damaged_clean_pixels", "mse", "psnr", "ssim"])
+                for name, _, table, scores, filtered in filtered_results:
+                    csv_writer.writerow([
+                        name, table["noisy"], table["fixed"], table["damaged"],
+                        f"{scores['mse']:.4f}", f"{scores['psnr']:.4f}", f"{scores['ssim']:.6f}",
+                    ])
+
+                    filtered_path = os.path.join(results_dir, f"{noise_name}_{name}.png")
+                    writer.write(filtered, filtered_path)
+
+            print(f"Saved table for {noise_name} to {table_path}")
+    store.close()
 
 if __name__ == "__main__":
     main()
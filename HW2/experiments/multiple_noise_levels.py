@@ -7,7 +7,9 @@ parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
-from common import filters, image_io, metrics, noise
+from common import image_io, metrics, noise, results_store
+from common.artifacts import ArtifactWriter
+from common.sweeps import coupled_filter_sweep
 
 
 def ensure_results_dir():
@@ -17,35 +19,57 @@ def ensure_results_dir():
     return results_dir
 
 
+def independent_levels(original, noise_levels):
+    """Draw fresh noise for every level and filter each image from scratch."""
+    for level in noise_levels:
+        noisy = noise.add_salt_and_pepper_noise(original, level)
+        # Filter and count in one pass; keep the image so it can be saved
+        scores = metrics.filter_and_score(original, noisy, "median", 3, keep_image=True)
+        yield level, noisy, scores["image"], scores
+
+
+def coupled_levels(original, noise_levels):
+    """Nest the noise across levels and only re-filter around newly corrupted pixels."""
+    for level, noisy, filtered in coupled_filter_sweep(original, noise_levels, "median", 3):
+        yield level, noisy, filtered, metrics.confusion_table(original, noisy, filtered)
+
+
 def main():
     image_path = input("Enter path to original clean image: ").strip()
     original = image_io.load_grayscale_image(image_path)
+    coupled = input("Nest noise across levels (coupled sweep)? [y/N]: ").strip().lower() == "y"
 
     noise_levels = [0.01, 0.03, 0.05, 0.1]
+    sweep = coupled_levels if coupled else independent_levels
     results_dir = ensure_results_dir()
+    store = results_store.open_store(os.path.join(results_dir, "results.db"))
+    run_id = results_store.start_run(store, "multiple_noise_levels")
 
     table_path = os.path.join(results_dir, "noise_levels.csv")
-    with open(table_path, "w", newline="") as csvfile:
+    with open(table_path, "w", newline="") as csvfile, ArtifactWriter() as artifact_writer:
         writer = csv.writer(csvfile)
         writer.writerow(["noise_level", "noisy_pixels", "fixed_pixels", "damaged_clean_pixels"])
 
-        for level in noise_levels:
-            noisy = noise.add_salt_and_pepper_noise(original, level)
-            filtered = filters.median_filter(noisy, 3)
-
-            noisy_pixels = metrics.count_noisy_pixels(original, noisy)
-            fixed_pixels = metrics.count_fixed_noisy_pixels(original, noisy, filtered)
-            damaged_clean = metrics.count_damaged_clean_pixels(original, noisy, filtered)
+        for level, noisy, filtered, scores in sweep(original, noise_levels):
+            noisy_pixels = scores["noisy"]
+            fixed_pixels = scores["fixed"]
+            damaged_clean = scores["damaged"]
 
             noisy_name = os.path.join(results_dir, f"noisy_level_{str(level).replace('.', '_')}.png")
             filtered_name = os.path.join(results_dir, f"filtered_level_{str(level).replace('.', '_')}.png")
-            image_io.save_grayscale_image(noisy, noisy_name)
-            image_io.save_grayscale_image(filtered, filtered_name)
+            artifact_writer.write(noisy, noisy_name)
+            artifact_writer.write(filtered, filtered_name)
 
             writer.writerow([level, noisy_pixels, fixed_pixels, damaged_clean])
+            results_store.insert_rows(store, run_id, [dict(
+                {name: scores[name] for name in ("noisy", "fixed", "unfixed", "damaged", "untouched")},
+                image=image_path, noise="salt_and_pepper", level=level,
+                filter="median", window=3, params=[], seed=None,
+            )])
             print(f"Level {level}: noisy={noisy_pixels}, fixed={fixed_pixels}, damaged={damaged_clean}")
             print(f"Saved noisy to {noisy_name} and filtered to {filtered_name}")
 
+    store.close()
     print(f"Table saved to {table_path}")
 
 
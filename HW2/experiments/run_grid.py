@@ -0,0 +1,69 @@
+import argparse
+import json
+import os
+import sys
+
+current_dir = os.path.dirname(__file__)
+parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from common import cache, grid
+
+# The noise types, levels and filters of multiple_filters.py and
+# multiple_noise_levels.py as one grid.
+DEFAULT_GRID = {
+    "images": [],
+    "noise": {
+        "salt_and_pepper": [0.01, 0.03, 0.05, 0.1],
+        "salt": [0.05],
+        "pepper": [0.05],
+        "gaussian": [10],
+        "uniform": [10],
+    },
+    "filters": {
+        "median": {"windows": [3]},
+        "mean": {"windows": [3]},
+        "trimmed_alpha": {"windows": [3], "params": [[1]]},
+        "contra_harmonic": {"windows": [3], "params": [[1]]},
+    },
+    "seed": 0,
+}
+
+
+def ensure_results_dir():
+    results_dir = os.path.join(os.path.dirname(__file__), "results")
+    if not os.path.exists(results_dir):
+        os.makedirs(results_dir)
+    return results_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a noise x filter experiment grid; reruns resume where they stopped.")
+    parser.add_argument("grid", nargs="?", help="JSON grid file (see common.grid.expand_grid); defaults to the built-in grid")
+    parser.add_argument("--image", action="append", default=[], help="image to run the grid on (repeatable, replaces the grid's images)")
+    parser.add_argument("--results", help="SQLite results database (default: results/results.db)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--cache", help="directory of cached noisy and filtered images to reuse across runs")
+    args = parser.parse_args()
+
+    spec = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid) as grid_file:
+            spec = json.load(grid_file)
+    if args.image:
+        spec = dict(spec, images=args.image)
+    if not spec["images"]:
+        parser.error("no images given; pass --image or list them in the grid file")
+
+    if args.cache:
+        # Workers see the cache through the environment variable this sets
+        cache.enable_cache(args.cache)
+
+    results_path = args.results or os.path.join(ensure_results_dir(), "results.db")
+    ran, skipped = grid.run_grid(spec, results_path, workers=args.workers)
+    print(f"Ran {ran} cells, skipped {skipped} already completed. Results in {results_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,13 +13,19 @@ def main():
     input_path = input("Enter path to input image: ").strip()
     levels = [0.01, 0.03, 0.05, 0.1]
     original = image_io.load_grayscale_image(input_path)
+    coupled = input("Nest noise across levels (coupled sweep)? [y/N]: ").strip().lower() == "y"
 
     output_dir = os.path.join(os.path.dirname(__file__), "sample_outputs")
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    for level in levels:
-        noisy = noise.add_salt_and_pepper_noise(original, level)
+    if coupled:
+        # One uniform draw for all levels, so each level adds to the previous one
+        noisy_images = ((level, noisy) for level, noisy, _ in noise.coupled_salt_and_pepper_noise(original, levels))
+    else:
+        noisy_images = ((level, noise.add_salt_and_pepper_noise(original, level)) for level in levels)
+
+    for level, noisy in noisy_images:
         output_path = os.path.join(output_dir, f"noisy_level_{str(level).replace('.', '_')}.png")
         image_io.save_grayscale_image(noisy, output_path)
         noisy_count = metrics.count_noisy_pixels(original, noisy)
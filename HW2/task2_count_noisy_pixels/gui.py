@@ -3,7 +3,7 @@ import sys
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
-from PIL import Image, ImageTk
+from PIL import ImageTk
 
 current_dir = os.path.dirname(__file__)
 parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
@@ -70,10 +70,7 @@ class CountNoisyGUI:
             return
         height = len(pixels)
         width = len(pixels[0])
-        img = Image.new("L", (width, height))
-        for y in range(height):
-            for x in range(width):
-                img.putpixel((x, y), int(pixels[y][x]))
+        img = image_io.to_pil_image(pixels)
         max_size = 300
         if width > max_size or height > max_size:
             img.thumbnail((max_size, max_size))
@@ -3,7 +3,7 @@ import sys
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
-from PIL import Image, ImageTk
+from PIL import ImageTk
 
 current_dir = os.path.dirname(__file__)
 parent_dir = os.path.abspath(os.path.join(current_dir, ".."))
@@ -39,12 +39,12 @@ class DenoiseGUI:
         options_frame.pack(pady=4)
         tk.Label(options_frame, text="Filter:").pack(side=tk.LEFT)
         self.filter_var = tk.StringVar(value="Median")
-        tk.OptionMenu(options_frame, self.filter_var, "Median", "Mean", "Trimmed-Alpha", "Contra-Harmonic").pack(
-            side=tk.LEFT, padx=4
-        )
+        tk.OptionMenu(
+            options_frame, self.filter_var, "Median", "Adaptive Median", "Mean", "Trimmed-Alpha", "Contra-Harmonic"
+        ).pack(side=tk.LEFT, padx=4)
 
         tk.Label(options_frame, text="Window Size:").pack(side=tk.LEFT)
-        self.window_scale = tk.Scale(options_frame, from_=3, to=7, resolution=2, orient=tk.HORIZONTAL)
+        self.window_scale = tk.Scale(options_frame, from_=3, to=31, resolution=2, orient=tk.HORIZONTAL)
         self.window_scale.set(3)
         self.window_scale.pack(side=tk.LEFT, padx=4)
 
@@ -97,6 +97,8 @@ class DenoiseGUI:
 
         if filter_name == "Median":
             self.filtered_pixels = filters.median_filter(self.noisy_pixels, window)
+        elif filter_name == "Adaptive Median":
+            self.filtered_pixels = filters.adaptive_median_filter(self.noisy_pixels, window)
         elif filter_name == "Mean":
             self.filtered_pixels = filters.mean_filter(self.noisy_pixels, window)
         elif filter_name == "Trimmed-Alpha":
@@ -122,19 +124,15 @@ class DenoiseGUI:
         if self.original_pixels is None or self.noisy_pixels is None or self.filtered_pixels is None:
             self.info_label.config(text="Fixed noisy: 0, Damaged clean: 0")
             return
-        fixed = metrics.count_fixed_noisy_pixels(self.original_pixels, self.noisy_pixels, self.filtered_pixels)
-        damaged = metrics.count_damaged_clean_pixels(self.original_pixels, self.noisy_pixels, self.filtered_pixels)
-        self.info_label.config(text=f"Fixed noisy: {fixed}, Damaged clean: {damaged}")
+        table = metrics.confusion_table(self.original_pixels, self.noisy_pixels, self.filtered_pixels)
+        self.info_label.config(text=f"Fixed noisy: {table['fixed']}, Damaged clean: {table['damaged']}")
 
     def show_image(self, pixels, label, kind):
         if pixels is None:
             return
         height = len(pixels)
         width = len(pixels[0])
-        img = Image.new("L", (width, height))
-        for y in range(height):
-            for x in range(width):
-                img.putpixel((x, y), int(pixels[y][x]))
+        img = image_io.to_pil_image(pixels)
         max_size = 250
         if width > max_size or height > max_size:
             img.thumbnail((max_size, max_size))
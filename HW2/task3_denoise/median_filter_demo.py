@@ -25,8 +25,9 @@ def main():
         output_path = os.path.join(output_dir, f"median_window_{window}.png")
         image_io.save_grayscale_image(filtered, output_path)
 
-        fixed = metrics.count_fixed_noisy_pixels(original, noisy, filtered)
-        damaged = metrics.count_damaged_clean_pixels(original, noisy, filtered)
+        table = metrics.confusion_table(original, noisy, filtered)
+        fixed = table["fixed"]
+        damaged = table["damaged"]
         print(f"Median window {window}: fixed noisy pixels = {fixed}, damaged clean pixels = {damaged}. Saved to {output_path}")
 
 
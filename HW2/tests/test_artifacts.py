@@ -0,0 +1,25 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from common import artifacts, image_io
+
+
+@pytest.mark.parametrize("pixels", [
+    np.array([[300.0, -5.0, 128.0], [255.9, 0.5, 12.7]]),
+    np.array([[300, -5, 128], [256, 0, 12]], dtype=np.int64),
+    [[300, -5, 128], [256, 0, 12]],
+])
+def test_writer_saves_what_save_grayscale_image_saves(tmp_path, pixels):
+    image_io.save_grayscale_image(pixels, str(tmp_path / "direct.png"))
+    with artifacts.ArtifactWriter() as writer:
+        writer.write(pixels, str(tmp_path / "queued.png"))
+
+    direct = image_io.load_grayscale_image(str(tmp_path / "direct.png"))
+    queued = image_io.load_grayscale_image(str(tmp_path / "queued.png"))
+    assert np.array_equal(queued, direct)
+    assert artifacts.stored_hash(str(tmp_path / "queued.png")) == artifacts.content_hash(direct)
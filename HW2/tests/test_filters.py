@@ -0,0 +1,87 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from common import filters
+from common.borders import BORDER_MODES
+
+WINDOWS = range(1, 14)
+TRIM_AMOUNTS = (0, 1, 3, 100)
+Q_VALUES = (-1.5, -1, 0, 1, 2)
+
+
+def _images():
+    rng = np.random.default_rng(0)
+    uniform = rng.integers(0, 256, (9, 11), dtype=np.uint8)
+    # Impulse-heavy image with runs of 0 and 255, where ties and zero windows matter
+    impulses = rng.choice(np.array([0, 1, 128, 254, 255], dtype=np.uint8), (7, 10))
+    return [uniform, impulses]
+
+
+def _same(actual, expected):
+    return np.array_equal(np.asarray(actual), np.asarray(expected))
+
+
+@pytest.mark.parametrize("border", BORDER_MODES)
+@pytest.mark.parametrize("window", WINDOWS)
+def test_vectorized_methods_match_python(window, border):
+    for image in _images():
+        expected = filters.median_filter(image, window, method="python", border=border)
+        for method in ("sort", "histogram", "auto"):
+            assert _same(filters.median_filter(image, window, method=method, border=border), expected), method
+
+        expected = filters.mean_filter(image, window, method="python", border=border)
+        assert _same(filters.mean_filter(image, window, method="integral", border=border), expected)
+
+        for trim_amount in TRIM_AMOUNTS:
+            expected = filters.trimmed_alpha_filter(image, window, trim_amount, method="python", border=border)
+            for method in ("sort", "histogram", "auto"):
+                actual = filters.trimmed_alpha_filter(image, window, trim_amount, method=method, border=border)
+                assert _same(actual, expected), (method, trim_amount)
+
+        for Q in Q_VALUES:
+            expected = filters.contra_harmonic_filter(image, window, Q, method="python", border=border)
+            assert _same(filters.contra_harmonic_filter(image, window, Q, method="lut", border=border), expected), Q
+
+
+@pytest.mark.parametrize("border", BORDER_MODES)
+@pytest.mark.parametrize("window", WINDOWS)
+def test_filter_bank_matches_individual_filters(window, border):
+    specs = [("median", window), ("mean", window)]
+    specs += [("trimmed_alpha", window, trim_amount) for trim_amount in TRIM_AMOUNTS]
+    specs += [("contra_harmonic", window, Q) for Q in Q_VALUES]
+    functions = {
+        "median": filters.median_filter,
+        "mean": filters.mean_filter,
+        "trimmed_alpha": filters.trimmed_alpha_filter,
+        "contra_harmonic": filters.contra_harmonic_filter,
+    }
+    for image in _images():
+        outputs = filters.filter_bank(image, specs, border=border)
+        for (kind, size, *params), output in zip(specs, outputs):
+            assert _same(output, functions[kind](image, size, *params, border=border)), (kind, params)
+
+
+def _baseline_window(image, y, x, offset):
+    """Window values read like the original list code, replicating edge pixels."""
+    return [
+        int(filters.get_pixel_safe(image, y + dy, x + dx))
+        for dy in range(-offset, offset + 1)
+        for dx in range(-offset, offset + 1)
+    ]
+
+
+@pytest.mark.parametrize("window", WINDOWS)
+def test_default_border_matches_original_edge_replication(window):
+    offset = window // 2
+    for image in _images():
+        height, width = image.shape
+        windows = [[sorted(_baseline_window(image, y, x, offset)) for x in range(width)] for y in range(height)]
+        median = [[values[len(values) // 2] for values in row] for row in windows]
+        mean = [[sum(values) // len(values) for values in row] for row in windows]
+        assert _same(filters.median_filter(image, window), median)
+        assert _same(filters.mean_filter(image, window), mean)
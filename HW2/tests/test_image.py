@@ -0,0 +1,31 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from common import arrays, metrics
+from common.image import GrayImage, as_image
+
+
+def test_as_image_converts_non_uint8_images():
+    image = as_image(np.arange(12).reshape(3, 4))
+    converted = as_image(image.astype(float) * 30)
+    assert converted.dtype == np.uint8
+    assert converted[-1][-1] == 255
+
+
+def test_rows_are_plain_arrays():
+    image = as_image(np.arange(12).reshape(3, 4))
+    assert not isinstance(image[0], GrayImage)
+    assert not isinstance(next(iter(image)), GrayImage)
+    assert isinstance(image[1:], GrayImage) and image[1:].width == 4
+
+
+def test_out_of_range_values_saturate_for_arrays_and_lists():
+    expected = np.array([[255, 0, 12]], dtype=np.uint8)
+    assert np.array_equal(arrays.as_array(np.array([[300, -5, 12]])), expected)
+    assert np.array_equal(arrays.as_array([[300, -5, 12.9]]), expected)
+    assert np.array_equal(as_image([[300, -5, 12]]), expected)
+    assert metrics.count_noisy_pixels([[10, 20]], [[10, 300]]) == 1
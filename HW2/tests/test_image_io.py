@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from common import image_io, streaming
+
+
+def _save_ramp(path, height=12, width=9):
+    pixels = (np.arange(height * width) % 256).astype(np.uint8).reshape(height, width)
+    Image.fromarray(pixels).save(path)
+    return pixels
+
+
+def test_file_readers_ignore_pillow_pixel_limit(tmp_path, monkeypatch):
+    pixels = _save_ramp(str(tmp_path / "ramp.png"))
+    # Below the 108-pixel image but above the 45-pixel bands read_rows crops
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 50)
+
+    loaded = image_io.load_grayscale_image(str(tmp_path / "ramp.png"))
+    streamed = np.array(list(streaming.read_rows(str(tmp_path / "ramp.png"), band_rows=5)))
+
+    assert np.array_equal(loaded, pixels)
+    assert np.array_equal(streamed, pixels)
+    assert Image.MAX_IMAGE_PIXELS == 50
+
+
+def test_paths_accept_pathlib(tmp_path):
+    pixels = _save_ramp(tmp_path / "ramp.png")
+    image_io.save_grayscale_image(pixels, tmp_path / "ramp.npy")
+
+    for path in (tmp_path / "ramp.png", tmp_path / "ramp.npy"):
+        assert np.array_equal(image_io.load_grayscale_image(path), pixels)
+        assert np.array_equal(image_io.load_grayscale_images([path])[0], pixels)
+        assert np.array_equal(np.array(list(streaming.read_rows(path))), pixels)
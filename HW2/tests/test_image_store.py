@@ -0,0 +1,26 @@
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from common import image_store
+
+
+def test_convert_to_store_opens_images_above_pillow_limit(tmp_path):
+    width, height = 20000, 10000
+    assert width * height > Image.MAX_IMAGE_PIXELS
+    source = Image.new("L", (width, height), 0)
+    source.paste(200, (0, height - 10, width, height))
+    source.save(tmp_path / "scan.png", compress_level=1)
+    del source
+    limit = Image.MAX_IMAGE_PIXELS
+
+    store = image_store.convert_to_store(str(tmp_path / "scan.png"), str(tmp_path / "scan.npy"))
+
+    assert store.shape == (height, width)
+    assert store[0, 0] == 0 and store[-1, -1] == 200
+    # The limit is only lifted while the file is opened
+    assert Image.MAX_IMAGE_PIXELS == limit
@@ -0,0 +1,36 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from common import filters, noise
+from common.image import GrayImage
+
+PIXELS = [[250, 10, 0, 255], [30, 200, 90, 5], [7, 80, 255, 60]]
+
+
+@pytest.mark.parametrize("function, args", [
+    (filters.median_filter, (3,)),
+    (filters.mean_filter, (3,)),
+    (filters.trimmed_alpha_filter, (3, 1)),
+    (filters.contra_harmonic_filter, (3, 1)),
+    (filters.adaptive_median_filter, ()),
+    (noise.add_salt_and_pepper_noise, (0.3, 1)),
+    (noise.add_salt_noise, (0.3, 1)),
+    (noise.add_pepper_noise, (0.3, 1)),
+    (noise.add_gaussian_noise, (0, 20, 1)),
+    (noise.add_uniform_noise, (-20, 20, 1)),
+])
+def test_lists_in_lists_out(function, args):
+    result = function(PIXELS, *args)
+    assert type(result) is list and all(type(row) is list for row in result)
+    assert all(type(value) is int for row in result for value in row)
+    assert result == function(np.array(PIXELS, dtype=np.uint8), *args).tolist()
+    assert isinstance(function(np.array(PIXELS, dtype=np.uint8), *args), GrayImage)
+
+
+def test_tiled_noise_returns_lists_for_lists():
+    assert type(noise.add_tiled_noise(PIXELS, "gaussian", 0, 20, seed=3)) is list
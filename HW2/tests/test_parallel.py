@@ -0,0 +1,24 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from common import filters, parallel
+
+
+@pytest.mark.parametrize("kind, window, params", [
+    ("median", 3, ()),
+    ("mean", 5, ()),
+    ("trimmed_alpha", 3, (1,)),
+    ("contra_harmonic", 3, (1,)),
+])
+def test_parallel_filter_pixels_outlive_shared_memory(kind, window, params):
+    image = np.random.default_rng(0).integers(0, 256, (37, 23), dtype=np.uint8)
+    filtered = parallel.parallel_filter(image, kind, window, *params, workers=2, band_rows=5)
+    expected = filters.filter_bank(image, [(kind, window, *params)])[0]
+    # Reading every pixel after the call fails if the result still points into shared memory
+    assert np.array_equal(np.asarray(filtered), np.asarray(expected))
+    assert int(filtered[-1][-1]) == int(expected[-1][-1])